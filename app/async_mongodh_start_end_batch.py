@@ -100,7 +100,7 @@ async def insert_event_batch(client, url, events):
         return False
 
 async def insert_events(config, num_event_pairs):
-    url = f"{config['API_URL']}/api/events"
+    url = f"{config['API_URL']}/api/events/batch"
     concurrency_limit = config['CONCURRENCY_LIMIT']
     batch_size = config['BATCH_SIZE']
     total_inserted = 0
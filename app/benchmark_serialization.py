@@ -0,0 +1,67 @@
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+
+from app.routes.events import router
+from app.services.event_service import EVENT_PROJECTION
+from app.utils.fast_json import BSONJSONResponse
+
+def generate_documents(count: int):
+    start = datetime(2024, 8, 1)
+    documents = []
+    for index in range(count):
+        documents.append({
+            '_id': ObjectId(),
+            'businessDate': '2024-08-01',
+            'eventName': f'TestEvent_{index:06d}',
+            'eventType': 'FILE',
+            'batchOrRealtime': 'BATCH',
+            'eventTime': start + timedelta(seconds=index),
+            'eventStatus': 'STARTED' if index % 2 == 0 else 'SUCCESS',
+            'resource': f'resource_{index % 10}',
+            'details': {'fileName': f'file_{index}.txt', 'fileSize': index * 10, 'numberOfRows': index},
+            'eventId': f'EVT#TestEvent_{index:06d}#STARTED#{uuid.uuid4()}',
+            'type': 'event',
+            'timestamp': start.isoformat(),
+        })
+    return documents
+
+def project(documents):
+    fields = [field for field, included in EVENT_PROJECTION.items() if included]
+    return [{field: document[field] for field in fields} for document in documents]
+
+async def current_path(route, documents):
+    content = await serialize_response(field=route.response_field, response_content=documents)
+    return JSONResponse(content).body
+
+async def fast_path(documents):
+    return BSONJSONResponse(documents).body
+
+async def benchmark(count: int, repeat: int):
+    route = next(route for route in router.routes if route.path == '/events' and 'GET' in route.methods)
+    documents = generate_documents(count)
+    projected = project(documents)
+
+    timings = {}
+    for name, run in (
+        ('response_model + JSONResponse', lambda: current_path(route, documents)),
+        ('projected + orjson', lambda: fast_path(projected)),
+    ):
+        best = float('inf')
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            body = await run()
+            best = min(best, time.perf_counter() - start_time)
+        timings[name] = best
+        print(f"{name:32s} {best * 1000:10.1f} ms  {len(body) / 1024 / 1024:6.1f} MiB")
+
+    baseline, fast = timings.values()
+    print(f"speedup: {baseline / fast:.1f}x for {count} events")
+
+if __name__ == "__main__":
+    asyncio.run(benchmark(count=100000, repeat=3))
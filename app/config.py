@@ -1,8 +1,116 @@
 from pydantic import BaseSettings
+from typing import Optional
 
 class Settings(BaseSettings):
     MONGODB_URL: str
     LOG_LEVEL: str = "INFO"
+    SECRET_KEY: Optional[str] = None
+    ACCESS_TOKEN_TTL_SECONDS: int = 8 * 3600
+    REDIS_URL: Optional[str] = "redis://localhost:6379/0"
+    REDIS_MAX_CONNECTIONS: int = 50
+    RESPONSE_CACHE_TTL_SECONDS: int = 300
+    # Don't store responses for a business date bumped more recently than this
+    RESPONSE_CACHE_MIN_QUIET_SECONDS: int = 30
+
+    # Per-worker Motor client pool
+    MONGODB_MAX_POOL_SIZE: int = 100
+    MONGODB_MIN_POOL_SIZE: int = 0
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = None
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = 30000
+    MONGODB_CONNECT_TIMEOUT_MS: int = 20000
+    MONGODB_COMPRESSORS: Optional[str] = None  # e.g. "zstd,snappy,zlib"
+
+    # Read preference for dashboard reads; staleness of -1 means no bound (otherwise >= 90)
+    MONGODB_READ_PREFERENCE: str = "primary"
+    MONGODB_READ_MAX_STALENESS_SECONDS: int = -1
+
+    # Default write concern for inserts; None leaves the server default
+    MONGODB_WRITE_CONCERN_W: Optional[str] = None
+    MONGODB_WRITE_CONCERN_J: Optional[bool] = None
+
+    # GET /api/events streaming and paging
+    EVENTS_STREAM_BATCH_SIZE: int = 1000
+    EVENTS_PAGE_MAX_LIMIT: int = 5000
+
+    # History window used to compute expected times
+    EXPECTATION_LOOKBACK_DAYS: int = 90
+
+    # Incremental event_statistics maintained on insert
+    RUNNING_STATS_ENABLED: bool = True
+    RUNNING_STATS_FLUSH_INTERVAL_MS: int = 1000
+    RUNNING_STATS_BUCKET_SECONDS: int = 60
+
+    # Per (eventName, eventStatus, month) rollups for /api/event_details
+    EVENT_ROLLUPS_ENABLED: bool = True
+    EVENT_DETAILS_DAYS: int = 30
+
+    # Two-tier cache for statistics and expectation reads
+    STATS_CACHE_ENABLED: bool = True
+    STATS_CACHE_MAX_ENTRIES: int = 10000
+    STATS_CACHE_TTL_SECONDS: int = 30
+
+    # RabbitMQ ingest; the publisher is only started when RABBITMQ_URL is set
+    RABBITMQ_URL: Optional[str] = None
+    RABBITMQ_QUEUE: str = "events_queue"
+    RABBITMQ_CHANNEL_POOL_SIZE: int = 4
+    RABBITMQ_PUBLISH_BATCH_SIZE: int = 200
+    RABBITMQ_PUBLISH_MAX_LATENCY_MS: int = 10
+    RABBITMQ_PUBLISH_MAX_PENDING: int = 10000  # beyond this, publishes get 503 + Retry-After
+    RABBITMQ_PUBLISH_RETRY_AFTER_SECONDS: int = 1
+    RABBITMQ_PUBLISH_MAX_RETRIES: int = 5
+    RABBITMQ_RECONNECT_MAX_BACKOFF_SECONDS: float = 5.0
+    RABBITMQ_CONSUMER_PROCESSES: int = 0  # 0 means one per CPU core
+    RABBITMQ_PREFETCH_COUNT: int = 1000
+    RABBITMQ_CONSUMER_BATCH_SIZE: int = 500
+    RABBITMQ_CONSUMER_MAX_LATENCY_MS: int = 200
+
+    # Encode read responses with orjson and skip response_model re-validation
+    FAST_JSON_RESPONSES: bool = False
+
+    # bcrypt runs on its own pool; 'thread' relies on bcrypt releasing the GIL
+    PASSWORD_HASH_EXECUTOR: str = "thread"
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
+    # Background deletion of business dates
+    DELETE_CHUNK_SIZE: int = 1000
+    DELETE_RATE_LIMIT_DOCS_PER_SECOND: int = 5000  # 0 disables throttling
+    DELETE_JOB_LEASE_SECONDS: int = 60
+    DELETE_JOB_POLL_SECONDS: int = 10
+
+    # Event storage partitioning by businessDate: 'none', 'month' or 'days'
+    EVENT_PARTITIONING: str = "none"
+    EVENT_PARTITION_DAYS: int = 7
+
+    # In-process metrics served on /metrics, merged across workers via Redis
+    METRICS_ENABLED: bool = True
+    METRICS_PUBLISH_INTERVAL_SECONDS: int = 15
+    METRICS_SLOW_QUERY_MS: int = 200  # 0 disables the slow-query log
+
+    # Live event updates over SSE/WebSocket from one change stream per worker
+    LIVE_UPDATES_ENABLED: bool = True
+    LIVE_UPDATES_QUEUE_SIZE: int = 1000  # per client; a full queue disconnects it
+    LIVE_UPDATES_REPLAY_SIZE: int = 10000
+    LIVE_UPDATES_HEARTBEAT_SECONDS: int = 15
+
+    # Incremental SLA evaluation into outcome documents
+    SLA_EVALUATOR_ENABLED: bool = True
+    SLA_FLUSH_INTERVAL_MS: int = 1000
+    SLA_GRACE_SECONDS: int = 0  # added to expectedLatestTime before MISSING
+    SLA_TIMER_TICK_SECONDS: int = 1
+    SLA_TIMER_SLOTS: int = 3600
+    SLA_EXPECTATIONS_REFRESH_SECONDS: int = 300
+    SLA_DATE_IDLE_SECONDS: int = 900  # dates before yesterday are dropped after this long without arrivals
+
+    # In-memory group status tables (latest status per grouped event) per worker
+    GROUP_STATUS_MAX_DATES: int = 7
+
+    # Write-behind buffer for single-event ingest
+    EVENT_BUFFER_ENABLED: bool = False
+    EVENT_BUFFER_MAX_BATCH_SIZE: int = 500
+    EVENT_BUFFER_MAX_LATENCY_MS: int = 50
+    EVENT_BUFFER_MAX_PENDING: int = 10000
+    EVENT_BUFFER_RETRY_AFTER_SECONDS: int = 1
 
     class Config:
         env_file = ".env"
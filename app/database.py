@@ -1,25 +1,96 @@
+import os
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.read_preferences import Primary, PrimaryPreferred, Secondary, SecondaryPreferred, Nearest
+from pymongo.write_concern import WriteConcern
+from typing import Any, Dict, Optional
 from app.config import settings
+from app.utils.metrics import command_listeners
 from urllib.parse import urlparse
 
+import logging
+
+logger = logging.getLogger(__name__)
+
 # Parse the MongoDB URL to get the database name
 parsed_url = urlparse(settings.MONGODB_URL)
 db_name = parsed_url.path.lstrip('/') or '4tellr'  # Fallback to '4tellr' if not specified
 
-client = AsyncIOMotorClient(settings.MONGODB_URL)
-db = client[db_name]
+READ_PREFERENCES = {
+    'primary': Primary,
+    'primaryPreferred': PrimaryPreferred,
+    'secondary': Secondary,
+    'secondaryPreferred': SecondaryPreferred,
+    'nearest': Nearest,
+}
+
+# One client per worker process, created on first use after uvicorn has
+# forked; a client inherited across fork() is never reused.
+_client: Optional[AsyncIOMotorClient] = None
+_client_pid: Optional[int] = None
+
+def client_options() -> Dict[str, Any]:
+    options = {
+        'maxPoolSize': settings.MONGODB_MAX_POOL_SIZE,
+        'minPoolSize': settings.MONGODB_MIN_POOL_SIZE,
+        'serverSelectionTimeoutMS': settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        'connectTimeoutMS': settings.MONGODB_CONNECT_TIMEOUT_MS,
+        'event_listeners': command_listeners(),
+    }
+    if settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS is not None:
+        options['waitQueueTimeoutMS'] = settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS
+    if settings.MONGODB_COMPRESSORS:
+        options['compressors'] = settings.MONGODB_COMPRESSORS
+    return options
+
+def get_client() -> AsyncIOMotorClient:
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        _client = AsyncIOMotorClient(settings.MONGODB_URL, **client_options())
+        _client_pid = os.getpid()
+    return _client
 
 def get_db():
-    return db
+    return get_client()[db_name]
+
+def read_preference():
+    mode = READ_PREFERENCES.get(settings.MONGODB_READ_PREFERENCE)
+    if mode is None:
+        raise ValueError(f"Unknown MONGODB_READ_PREFERENCE: {settings.MONGODB_READ_PREFERENCE}")
+    if mode is Primary:
+        return Primary()
+    return mode(max_staleness=settings.MONGODB_READ_MAX_STALENESS_SECONDS)
+
+def get_read_db():
+    """Database handle for read-only dashboard endpoints; routes to
+    secondaries when MONGODB_READ_PREFERENCE allows it."""
+    if settings.MONGODB_READ_PREFERENCE == 'primary':
+        return get_db()
+    return get_client().get_database(db_name, read_preference=read_preference())
+
+def get_write_concern(w: Optional[str] = None, j: Optional[bool] = None) -> Optional[WriteConcern]:
+    w = w if w is not None else settings.MONGODB_WRITE_CONCERN_W
+    j = j if j is not None else settings.MONGODB_WRITE_CONCERN_J
+    if w is None and j is None:
+        return None
+    options = {}
+    if w is not None:
+        options['w'] = int(w) if w.isdigit() else w
+    if j is not None:
+        options['j'] = j
+    return WriteConcern(**options)
 
 async def connect_to_mongo():
     try:
-        await client.admin.command('ping')
+        await get_client().admin.command('ping')
         print(f"Connected to MongoDB database: {db_name}")
     except Exception as e:
         print(f"Error connecting to MongoDB: {e}")
         raise
 
 async def close_mongo_connection():
-    client.close()
-    print("Closed MongoDB connection")
\ No newline at end of file
+    global _client, _client_pid
+    if _client is not None:
+        _client.close()
+        _client = None
+        _client_pid = None
+    print("Closed MongoDB connection")
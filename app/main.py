@@ -1,16 +1,24 @@
 import asyncio
 from fastapi import FastAPI, Request, BackgroundTasks
 from fastapi.middleware.gzip import GZipMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
-from fastapi_cache import FastAPICache
-from fastapi_cache.backends.redis import RedisBackend
 from fastapi_cache.decorator import cache
 import logging
-from app.routes import events
+from app.routes import events, groups, login, metrics, profile, users
 from app.config import settings
-from app.database import connect_to_mongo, close_mongo_connection
-import redis
-import time
+from app.database import connect_to_mongo, close_mongo_connection, get_db
+from app.services.event_buffer import start_event_buffer, stop_event_buffer
+from app.services.index_service import IndexService
+from app.services.running_statistics import start_running_statistics, stop_running_statistics
+from app.services.rabbitmq_publisher import start_event_publisher, stop_event_publisher
+from app.services.deletion_service import start_deletion_runner, stop_deletion_runner
+from app.services.live_updates import start_live_event_hub, stop_live_event_hub
+from app.services.sla_evaluator import start_sla_evaluator, stop_sla_evaluator
+from app.utils.cache import start_stats_cache, stop_stats_cache
+from app.utils.response_cache import init_response_cache
+from app.utils.password_hasher import shutdown_password_hasher
+from app.utils.auth_tokens import require_secret_key, start_revocation_list, stop_revocation_list
+from app.utils.timing import CompressionTimingMiddleware, ServerTimingMiddleware
+from app.utils.metrics import MetricsMiddleware, start_metrics_publisher, stop_metrics_publisher
 
 # Configure logging
 logging.basicConfig(level=settings.LOG_LEVEL)
@@ -19,41 +27,65 @@ logger = logging.getLogger(__name__)
 # Initialize FastAPI app
 app = FastAPI()
 
-# Add Gzip compression
+# Add Gzip compression, timed from just inside the compressor
+app.add_middleware(CompressionTimingMiddleware)
 app.add_middleware(GZipMiddleware, minimum_size=1000)
 
-# Custom middleware for timing requests
-class TimingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        response = await call_next(request)
-        process_time = time.time() - start_time
-        response.headers["X-Process-Time"] = str(process_time)
-        return response
+# Outermost: per-phase Server-Timing header for every request
+app.add_middleware(ServerTimingMiddleware)
 
-app.add_middleware(TimingMiddleware)
+# Request counters and latency histograms for /metrics
+app.add_middleware(MetricsMiddleware)
 
 # Startup and shutdown events
 @app.on_event("startup")
 async def startup_event():
+    require_secret_key()
     await asyncio.gather(
         connect_to_mongo(),
         print_routes(),
-        setup_cache()
+        setup_cache(),
+        start_event_buffer(get_db()),
+        start_running_statistics(get_db()),
+        start_sla_evaluator(get_db()),
+        start_stats_cache(),
+        start_event_publisher(),
+        start_revocation_list(),
+        start_deletion_runner(get_db()),
+        start_metrics_publisher(),
+        start_live_event_hub(get_db()),
+        ensure_indexes()
     )
 
 async def print_routes():
     routes = [f"{route.methods} {route.path}" for route in app.routes]
     logger.info("Available routes:\n" + "\n".join(routes))
 
+async def ensure_indexes():
+    await IndexService(get_db()).reconcile()
+
 async def setup_cache():
-    redis_client = redis.Redis(host='localhost', port=6379, db=0)
-    FastAPICache.init(RedisBackend(redis_client), prefix="fastapi-cache:")
+    init_response_cache()
 
+app.add_event_handler("shutdown", stop_event_buffer)
+app.add_event_handler("shutdown", stop_running_statistics)
+app.add_event_handler("shutdown", stop_sla_evaluator)
+app.add_event_handler("shutdown", stop_stats_cache)
+app.add_event_handler("shutdown", stop_event_publisher)
+app.add_event_handler("shutdown", shutdown_password_hasher)
+app.add_event_handler("shutdown", stop_revocation_list)
+app.add_event_handler("shutdown", stop_deletion_runner)
+app.add_event_handler("shutdown", stop_metrics_publisher)
+app.add_event_handler("shutdown", stop_live_event_hub)
 app.add_event_handler("shutdown", close_mongo_connection)
 
 # Include routers
 app.include_router(events.router, prefix="/api")
+app.include_router(login.router, prefix="/api")
+app.include_router(users.router, prefix="/api")
+app.include_router(groups.router, prefix="/api")
+app.include_router(profile.router, prefix="/api")
+app.include_router(metrics.router)
 
 # Test route
 @app.get("/test")
@@ -1 +1 @@
-from .models import Event, EventDetails
\ No newline at end of file
+from .models import Event, EventBase, EventCreate, EventDetails
\ No newline at end of file
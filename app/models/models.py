@@ -16,6 +16,19 @@ class EventDetails(BaseModel):
     stepName: Union[str, None] = None
     status: Union[str, None] = None
 
+class EventBase(BaseModel):
+    businessDate: str
+    eventName: str
+    eventType: str
+    batchOrRealtime: str
+    eventTime: datetime
+    eventStatus: str
+    resource: str
+    details: dict
+
+class EventCreate(EventBase):
+    pass
+
 class Event(BaseModel):
     businessDate: str
     eventName: str
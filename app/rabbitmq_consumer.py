@@ -0,0 +1,162 @@
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+from typing import List, Optional
+
+from pydantic import ValidationError
+
+from app.config import settings
+from app.models import EventCreate
+from app.services.event_service import EventService
+from app.services.rabbitmq_publisher import decode_event, queue_arguments, dead_letter_queue_name
+from app.utils.batching import MicroBatcher
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+class EventBatchLoader:
+    """Drains queue deliveries into insert_many batches. Messages are acked
+    only after their batch commits; undecodable or invalid messages and rows
+    Mongo rejects are dead-lettered instead of redelivered."""
+
+    def __init__(self, db, max_batch_size: int, max_latency_ms: int):
+        self.event_service = EventService(db)
+        self._batcher = MicroBatcher(self.load_batch, max_batch_size, max_latency_ms)
+
+        self.inserted = 0
+        self.dead_lettered = 0
+        self.requeued = 0
+        self.settle_failures = 0
+
+    async def on_message(self, message):
+        self._batcher.add(message)
+
+    def start(self):
+        self._batcher.start()
+
+    async def stop(self):
+        """Loads and settles every message already delivered."""
+        await self._batcher.stop()
+
+    async def load_batch(self, messages: List):
+        valid_messages, events_data = [], []
+        for message in messages:
+            try:
+                event = EventCreate.parse_obj(decode_event(message.body))
+            except (ValueError, ValidationError) as e:
+                logger.warning(f"Dead-lettering invalid event message: {str(e)}")
+                await self._settle(message.reject(requeue=False))
+                self.dead_lettered += 1
+                continue
+            valid_messages.append(message)
+            events_data.append(EventService.prepare_event_data(event.dict()))
+
+        try:
+            results = await self.event_service.insert_events(events_data)
+        except Exception as e:
+            logger.error(f"Batch insert failed, requeueing {len(valid_messages)} messages: {str(e)}", exc_info=True)
+            for message in valid_messages:
+                await self._settle(message.nack(requeue=True))
+            self.requeued += len(valid_messages)
+            await asyncio.sleep(1)
+            return
+
+        last_inserted = None
+        for message, result in zip(valid_messages, results):
+            if result['success']:
+                last_inserted = message
+                self.inserted += 1
+            else:
+                logger.warning(f"Dead-lettering event rejected by Mongo: {result['error']}")
+                await self._settle(message.reject(requeue=False))
+                self.dead_lettered += 1
+        # Batches are settled in delivery order and the rejects above are
+        # already settled, so one multiple-ack covers the rest of the batch
+        if last_inserted is not None:
+            await self._settle(last_inserted.ack(multiple=True))
+
+    async def _settle(self, settlement):
+        # Fails while the channel is closed or reconnecting; the broker then
+        # redelivers the unsettled messages, and that is the recovery
+        try:
+            await settlement
+        except Exception as e:
+            self.settle_failures += 1
+            logger.warning(f"Failed to settle message, it will be redelivered: {str(e)}")
+
+async def consume(worker_index: int):
+    import aio_pika
+    from app.database import get_db, connect_to_mongo, close_mongo_connection
+    from app.services.running_statistics import start_running_statistics, stop_running_statistics
+    from app.services.sla_evaluator import start_sla_evaluator, stop_sla_evaluator
+    from app.utils.response_cache import init_response_cache
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stopping.set)
+
+    await connect_to_mongo()
+    init_response_cache()
+    await start_running_statistics(get_db())
+    await start_sla_evaluator(get_db())
+
+    loader = EventBatchLoader(
+        get_db(),
+        max_batch_size=settings.RABBITMQ_CONSUMER_BATCH_SIZE,
+        max_latency_ms=settings.RABBITMQ_CONSUMER_MAX_LATENCY_MS,
+    )
+    connection = await aio_pika.connect_robust(settings.RABBITMQ_URL)
+    try:
+        channel = await connection.channel()
+        await channel.set_qos(prefetch_count=settings.RABBITMQ_PREFETCH_COUNT)
+        await channel.declare_queue(dead_letter_queue_name(settings.RABBITMQ_QUEUE), durable=True)
+        queue = await channel.declare_queue(
+            settings.RABBITMQ_QUEUE, durable=True, arguments=queue_arguments(settings.RABBITMQ_QUEUE)
+        )
+        loader.start()
+        consumer_tag = await queue.consume(loader.on_message)
+        logger.info(f"Consumer {worker_index} (pid {os.getpid()}) consuming from {settings.RABBITMQ_QUEUE}")
+        await stopping.wait()
+        logger.info(f"Consumer {worker_index} stopping, draining delivered messages")
+        await queue.cancel(consumer_tag)
+        await loader.stop()
+    finally:
+        await connection.close()
+        await stop_running_statistics()
+        await stop_sla_evaluator()
+        await close_mongo_connection()
+
+def run_worker(worker_index: int):
+    logging.basicConfig(level=settings.LOG_LEVEL)
+    try:
+        asyncio.run(consume(worker_index))
+    except KeyboardInterrupt:
+        pass
+
+def main(processes: Optional[int] = None):
+    if not settings.RABBITMQ_URL:
+        raise SystemExit("RABBITMQ_URL is not configured")
+    processes = processes or settings.RABBITMQ_CONSUMER_PROCESSES or os.cpu_count() or 1
+    # spawn so each worker builds its own Mongo and AMQP clients
+    context = multiprocessing.get_context('spawn')
+    workers = [context.Process(target=run_worker, args=(index,)) for index in range(processes)]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        # SIGTERM lets each worker drain its batch and flush statistics and SLA outcomes
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.join()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load RabbitMQ-published events into MongoDB")
+    parser.add_argument("--processes", type=int, default=None)
+    main(parser.parse_args().processes)
@@ -1,38 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Body
+from fastapi import APIRouter, Depends, HTTPException, Query, Body, Request, Response, Header, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 from datetime import datetime
 import uuid
+import json
 # events.py
 import asyncio
 import aiohttp
 from fastapi import BackgroundTasks
 
-from app.services.event_service import EventService
-from app.database import get_db
+from app.models import EventBase, EventCreate
+from app.services.event_service import EventService, InvalidPageCursor
+from app.services.event_buffer import get_event_buffer, EventBufferFull
+from app.services.rabbitmq_publisher import EventPublisherFull, EventPublisherUnavailable, get_event_publisher
+from app.services.deletion_service import DeletionJobService, get_deletion_runner
+from app.services.group_service import GroupService
+from app.services.live_updates import get_live_event_hub
+from app.services.sla_evaluator import get_sla_evaluator, sla_scope
+from app.utils.cache import get_stats_cache
+from app.utils.response_cache import cached_for_business_date, business_date_etag, etag_matches
+from app.utils.fast_json import BSONJSONResponse, fast_response
+from app.utils.timing import TimedRoute
+from app.config import settings
+from app.database import get_db, get_read_db, get_write_concern
 
 import logging
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
-
-class EventBase(BaseModel):
-    businessDate: str
-    eventName: str
-    eventType: str
-    batchOrRealtime: str
-    eventTime: datetime
-    eventStatus: str
-    resource: str
-    details: dict
-
-class EventCreate(EventBase):
-    pass
+router = APIRouter(route_class=TimedRoute)
 
 class Event(EventBase):
     eventId: str
 
+class EventBatchCreate(BaseModel):
+    events: List[dict]
+
+class EventBatchItemResult(BaseModel):
+    index: int
+    success: bool
+    eventId: Optional[str] = None
+    error: Optional[str] = None
+
+class EventBatchResult(BaseModel):
+    inserted: int
+    failed: int
+    results: List[EventBatchItemResult]
+
 class EventOutcome(BaseModel):
     events: List[dict]
 
@@ -47,27 +62,85 @@ class ChartData(BaseModel):
     outcomeStatus: str
     plotStatus: str
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def _etag_headers(etag: Optional[str]) -> dict:
+    if etag is None:
+        return {}
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+async def _conditional_etag(request: Request, namespace: str, business_date: str):
+    """Returns (etag, 304 response or None); checked before any query runs."""
+    etag = await business_date_etag(namespace, business_date)
+    if etag is not None and etag_matches(request.headers.get("if-none-match"), etag):
+        return etag, Response(status_code=304, headers=_etag_headers(etag))
+    return etag, None
+
+async def _ndjson_rows(rows):
+    async for row in rows:
+        yield json.dumps(row, default=_json_default) + "\n"
+
 @router.get("/events", response_model=List[Event])
 async def get_events_by_date(
+    request: Request,
+    response: Response,
     business_date: str = Query(..., alias="businessDate"),
-    db = Depends(get_db)
+    after: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=settings.EVENTS_PAGE_MAX_LIMIT),
+    db = Depends(get_read_db)
 ):
     try:
         event_service = EventService(db)
-        events = await event_service.query_events_by_date(business_date)
-        return events
+        if NDJSON_MEDIA_TYPE in request.headers.get("accept", ""):
+            rows = event_service.iter_events_by_date(business_date, settings.EVENTS_STREAM_BATCH_SIZE)
+            return StreamingResponse(_ndjson_rows(rows), media_type=NDJSON_MEDIA_TYPE)
+        if limit is not None or after is not None:
+            events, next_cursor = await event_service.query_events_page(
+                business_date, after, limit or settings.EVENTS_PAGE_MAX_LIMIT
+            )
+            if settings.FAST_JSON_RESPONSES:
+                response = BSONJSONResponse(events)
+                if next_cursor:
+                    response.headers["X-Next-Cursor"] = next_cursor
+                return response
+            if next_cursor:
+                response.headers["X-Next-Cursor"] = next_cursor
+            return events
+        etag, not_modified = await _conditional_etag(request, "events", business_date)
+        if not_modified is not None:
+            return not_modified
+        events = await cached_for_business_date(
+            "events", business_date, lambda: event_service.query_events_by_date(business_date)
+        )
+        response.headers.update(_etag_headers(etag))
+        return fast_response(events, _etag_headers(etag))
+    except InvalidPageCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/chart_data", response_model=List[ChartData])
 async def get_events_by_date_for_chart(
+    request: Request,
+    response: Response,
     business_date: str = Query(..., alias="businessDate"),
-    db = Depends(get_db)
+    db = Depends(get_read_db)
 ):
     try:
+        etag, not_modified = await _conditional_etag(request, "chart_data", business_date)
+        if not_modified is not None:
+            return not_modified
         event_service = EventService(db)
-        events = await event_service.query_events_by_date_for_chart(business_date)
-        return events
+        events = await cached_for_business_date(
+            "chart_data", business_date, lambda: event_service.query_events_by_date_for_chart(business_date)
+        )
+        response.headers.update(_etag_headers(etag))
+        return fast_response(events, _etag_headers(etag))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -85,65 +158,314 @@ async def get_event_details(
         raise HTTPException(status_code=500,detail=str(e))
 
 @router.post("/events", response_model=Event)
-async def create_event(event: EventCreate, db = Depends(get_db)):
+async def create_event(
+    event: EventCreate,
+    w: Optional[str] = Query(None),
+    j: Optional[bool] = Query(None),
+    db = Depends(get_db)
+):
     try:
-        logger.info(f"Received event: {event.dict()}")
-        event_service = EventService(db)
-        event_id = f'EVT#{event.eventName}#{event.eventStatus}#{str(uuid.uuid4())}'
-        event_data = event.dict()
-        event_data['eventId'] = event_id
-        event_data['type'] = 'event'
-        event_data['timestamp'] = datetime.now().isoformat()
-        logger.info(f"Processed event data: {event_data}")
-        new_event = await event_service.insert_event(event_data)
-        logger.info(f"Inserted event: {new_event}")
+        logger.debug(f"Received event: {event.dict()}")
+        event_service = EventService(db, get_write_concern(w, j))
+        event_data = EventService.prepare_event_data(event.dict())
+        event_buffer = get_event_buffer()
+        # The buffer writes with the default concern; an explicit ?w=/?j= is honoured by inserting directly
+        if event_buffer is not None and w is None and j is None:
+            new_event = await event_buffer.submit(event_data)
+        else:
+            new_event = await event_service.insert_event(event_data)
+        logger.debug(f"Inserted event: {new_event['eventId']}")
         return new_event
+    except EventBufferFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Event buffer is full, retry later",
+            headers={"Retry-After": str(settings.EVENT_BUFFER_RETRY_AFTER_SECONDS)}
+        )
     except Exception as e:
         logger.error(f"Error creating event: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
     
+@router.post("/events/batch", response_model=EventBatchResult)
+async def create_events_batch(
+    batch: EventBatchCreate,
+    w: Optional[str] = Query(None),
+    j: Optional[bool] = Query(None),
+    db = Depends(get_db)
+):
+    try:
+        event_service = EventService(db, get_write_concern(w, j))
+        results = [None] * len(batch.events)
+        prepared = []
+        prepared_indexes = []
+        for index, raw_event in enumerate(batch.events):
+            try:
+                event = EventCreate.parse_obj(raw_event)
+            except ValidationError as e:
+                results[index] = EventBatchItemResult(index=index, success=False, error=str(e))
+                continue
+            prepared.append(EventService.prepare_event_data(event.dict()))
+            prepared_indexes.append(index)
+
+        insert_results = await event_service.insert_events(prepared)
+        for index, insert_result in zip(prepared_indexes, insert_results):
+            results[index] = EventBatchItemResult(index=index, **insert_result)
+
+        inserted = sum(1 for result in results if result.success)
+        logger.info(f"Batch insert: {inserted} inserted, {len(results) - inserted} failed")
+        return EventBatchResult(inserted=inserted, failed=len(results) - inserted, results=results)
+    except Exception as e:
+        logger.error(f"Error creating event batch: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/events/buffer/stats", response_model=dict)
+async def get_event_buffer_stats():
+    event_buffer = get_event_buffer()
+    if event_buffer is None:
+        return {"enabled": False}
+    return {"enabled": True, **event_buffer.stats()}
+
+@router.get("/events/cache/stats", response_model=dict)
+async def get_stats_cache_stats():
+    stats_cache = get_stats_cache()
+    if stats_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **stats_cache.stats()}
+
 @router.post("/events/rabbitmq")
 async def create_event_rabbitmq(event: EventCreate, db = Depends(get_db)):
     try:
         event_service = EventService(db)
         await event_service.publish_event_to_rabbitmq(event.dict())
         return {"status": "success", "message": "Event sent to RabbitMQ"}
+    except EventPublisherFull:
+        raise HTTPException(
+            status_code=503,
+            detail="RabbitMQ publish queue is full, retry later",
+            headers={"Retry-After": str(settings.RABBITMQ_PUBLISH_RETRY_AFTER_SECONDS)}
+        )
+    except EventPublisherUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/events/rabbitmq/stats", response_model=dict)
+async def get_event_publisher_stats():
+    event_publisher = get_event_publisher()
+    if event_publisher is None:
+        return {"enabled": False}
+    return {"enabled": True, **event_publisher.stats()}
+
+SSE_MEDIA_TYPE = "text/event-stream"
+
+async def _group_event_names(db, group: Optional[str]):
+    if group is None:
+        return None
+    details = await GroupService(db).get_group_details(group)
+    if details is None:
+        return False
+    return set(details.get('events', []))
+
+def _sse_message(message: dict) -> str:
+    data = f"event: {message['type']}\ndata: {json.dumps(message, default=_json_default)}\n\n"
+    if message['id'] is None:
+        return data
+    return f"id: {message['id']}\n" + data
+
+@router.get("/events/live")
+async def stream_live_events(
+    request: Request,
+    business_date: str = Query(..., alias="businessDate"),
+    group: Optional[str] = Query(None),
+    resume_after: Optional[str] = Query(None, alias="resumeAfter"),
+    last_event_id: Optional[str] = Header(None),
+    db = Depends(get_read_db)
+):
+    hub = get_live_event_hub()
+    if hub is None:
+        raise HTTPException(status_code=503, detail="Live updates are disabled")
+    event_names = await _group_event_names(db, group)
+    if event_names is False:
+        raise HTTPException(status_code=404, detail="Group not found")
+    subscription = hub.subscribe(business_date, event_names, resume_after or last_event_id)
+
+    async def messages():
+        try:
+            yield f"retry: {settings.LIVE_UPDATES_HEARTBEAT_SECONDS * 1000}\n\n"
+            while not await request.is_disconnected():
+                message = await subscription.next(settings.LIVE_UPDATES_HEARTBEAT_SECONDS)
+                if message is None:
+                    yield ": keepalive\n\n"
+                    continue
+                yield _sse_message(message)
+                if message['type'] == 'disconnect':
+                    break
+        finally:
+            subscription.close()
+
+    # identity encoding keeps GZipMiddleware from buffering the stream
+    return StreamingResponse(messages(), media_type=SSE_MEDIA_TYPE, headers={
+        "Cache-Control": "no-cache",
+        "Content-Encoding": "identity",
+        "X-Accel-Buffering": "no",
+    })
+
+@router.websocket("/events/live/ws")
+async def websocket_live_events(
+    websocket: WebSocket,
+    business_date: str = Query(..., alias="businessDate"),
+    group: Optional[str] = Query(None),
+    resume_after: Optional[str] = Query(None, alias="resumeAfter"),
+    db = Depends(get_read_db)
+):
+    hub = get_live_event_hub()
+    if hub is None:
+        await websocket.close(code=1013, reason="Live updates are disabled")
+        return
+    event_names = await _group_event_names(db, group)
+    if event_names is False:
+        await websocket.close(code=1008, reason="Group not found")
+        return
+    await websocket.accept()
+    subscription = hub.subscribe(business_date, event_names, resume_after)
+    try:
+        while True:
+            message = await subscription.next(settings.LIVE_UPDATES_HEARTBEAT_SECONDS)
+            if message is None:
+                await websocket.send_text('{"type": "ping"}')
+                continue
+            await websocket.send_text(json.dumps(message, default=_json_default))
+            if message['type'] == 'disconnect':
+                await websocket.close(code=1013, reason=message['reason'])
+                break
+    except WebSocketDisconnect:
+        pass
+    finally:
+        subscription.close()
+
+@router.get("/events/live/stats", response_model=dict)
+async def get_live_updates_stats():
+    hub = get_live_event_hub()
+    if hub is None:
+        return {"enabled": False}
+    return {"enabled": True, **hub.stats()}
+
 @router.post("/events/generate-expectations")
 async def generate_expectations(
     business_date: str = Body(..., embed=True),
+    end_date: Optional[str] = Body(None, embed=True),
     db = Depends(get_db)
 ):
     try:
         event_service = EventService(db)
-        await event_service.delete_expectations_for_business_date(business_date)
-        result = await event_service.generate_expectations(business_date)
+        result = await event_service.generate_expectations(business_date, end_date)
         if not result:
             raise HTTPException(status_code=404, detail="Unable to generate expectations, no metrics found.")
         return {"status": "Success"}
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/events/delete_events")
+class DeletionJob(BaseModel):
+    job_id: str
+    business_dates: List[str]
+    status: str
+    deleted: int
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+def _deletion_job(job: dict) -> DeletionJob:
+    return DeletionJob(job_id=str(job['_id']), **job)
+
+@router.post("/events/delete_events", response_model=DeletionJob, status_code=202)
 async def delete_events(
     business_dates: List[str] = Body(..., embed=True),
     db = Depends(get_db)
 ):
     try:
+        deletion_service = DeletionJobService(db)
+        job = await deletion_service.create_job(business_dates)
+        deletion_runner = get_deletion_runner()
+        if deletion_runner is not None:
+            deletion_runner.wakeup()
+        return _deletion_job(job)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/events/delete_events/{job_id}", response_model=DeletionJob)
+async def get_delete_events_status(job_id: str, db = Depends(get_db)):
+    try:
+        deletion_service = DeletionJobService(db)
+        job = await deletion_service.get_job(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Deletion job not found")
+        return _deletion_job(job)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/events/partitions/retention")
+async def drop_event_partitions(
+    before: str = Body(..., embed=True, pattern=r"^\d{4}-\d{2}-\d{2}$"),
+    db = Depends(get_db)
+):
+    try:
+        event_service = EventService(db)
+        dropped = await event_service.drop_partitions_before(before)
+        return {"dropped": dropped}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/events/rollups/rebuild")
+async def rebuild_monthly_rollups(
+    month: str = Body(..., embed=True, regex=r"^\d{4}-\d{2}$"),
+    db = Depends(get_db)
+):
+    try:
+        event_service = EventService(db)
+        await event_service.rebuild_monthly_rollups(month)
+        return {"status": "success"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/sla", response_model=dict)
+async def get_sla_outcomes(
+    request: Request,
+    response: Response,
+    business_date: str = Query(..., alias="businessDate"),
+    db = Depends(get_read_db)
+):
+    try:
+        etag, not_modified = await _conditional_etag(request, "sla", sla_scope(business_date))
+        if not_modified is not None:
+            return not_modified
         event_service = EventService(db)
-        await event_service.delete_events_for_business_dates(business_dates)
-        return {"message": "Events deleted successfully"}
+        outcomes = await cached_for_business_date(
+            "sla", sla_scope(business_date), lambda: event_service.get_sla_outcomes(business_date)
+        )
+        response.headers.update(_etag_headers(etag))
+        return fast_response(outcomes, _etag_headers(etag))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/sla/stats", response_model=dict)
+async def get_sla_evaluator_stats():
+    evaluator = get_sla_evaluator()
+    if evaluator is None:
+        return {"enabled": False}
+    return {"enabled": True, **evaluator.stats()}
+
 @router.get("/events/latest-metrics", response_model=List[dict])
-async def get_latest_metrics(db = Depends(get_db)):
+async def get_latest_metrics(db = Depends(get_read_db)):
     try:
         event_service = EventService(db)
         latest_metrics = await event_service.get_latest_metrics()
-        return latest_metrics
+        return fast_response(latest_metrics)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -160,7 +482,7 @@ async def update_expected_times(db = Depends(get_db)):
 async def get_expected_time(
     event_name: str,
     event_status: str,
-    db = Depends(get_db)
+    db = Depends(get_read_db)
 ):
     try:
         event_service = EventService(db)
@@ -172,19 +494,20 @@ async def get_expected_time(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/get_expectation_list", response_model=List[dict])
-async def get_expectation_list(db = Depends(get_db)):
+async def get_expectation_list(db = Depends(get_read_db)):
     try:
+        # No ETag: running statistics change on every recorder flush without a version bump
         event_service = EventService(db)
         items = await event_service.get_expectation_list()
-        return items
+        return fast_response(items)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/process/get_process_statistics_list", response_model=List[dict])
-async def get_process_stats_list(db = Depends(get_db)):
+async def get_process_stats_list(db = Depends(get_read_db)):
     try:
         event_service = EventService(db)
         items = await event_service.get_process_stats_list()
-        return items
+        return fast_response(items)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
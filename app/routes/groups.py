@@ -0,0 +1,98 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List
+from pydantic import BaseModel
+
+from app.services.group_service import GroupService
+from app.services.group_status import get_group_status_tracker
+from app.services.user_service import UserService
+from app.database import get_db
+from app.utils.fast_json import fast_response
+from app.utils.auth_tokens import get_current_user
+from app.utils.timing import TimedRoute
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(route_class=TimedRoute)
+
+class Group(BaseModel):
+    name: str
+    events: List[str]
+    description: str = ""
+
+@router.get("/groups", response_model=List[Group])
+async def get_all_groups(db = Depends(get_db), claims: dict = Depends(get_current_user)):
+    try:
+        group_service = GroupService(db)
+        return await group_service.get_all_groups()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/groups", response_model=Group)
+async def save_group(group: Group, db = Depends(get_db), claims: dict = Depends(get_current_user)):
+    try:
+        group_service = GroupService(db)
+        return await group_service.save_group(group.name, group.events, group.description)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/groups/favourites/status", response_model=List[dict])
+async def get_favourite_groups_status(
+    business_date: str = Query(..., alias="businessDate"),
+    db = Depends(get_db),
+    claims: dict = Depends(get_current_user)
+):
+    try:
+        user = await UserService(db).get_user_by_email(claims['sub'])
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        statuses = await get_group_status_tracker().group_statuses(db, business_date, user.get('favourite_groups', []))
+        return fast_response([status for status in statuses if status is not None])
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/groups/status/stats", response_model=dict)
+async def get_group_status_stats(claims: dict = Depends(get_current_user)):
+    return get_group_status_tracker().stats()
+
+@router.get("/groups/{name}/status", response_model=dict)
+async def get_group_status(
+    name: str,
+    business_date: str = Query(..., alias="businessDate"),
+    db = Depends(get_db),
+    claims: dict = Depends(get_current_user)
+):
+    try:
+        status, = await get_group_status_tracker().group_statuses(db, business_date, [name])
+        if status is None:
+            raise HTTPException(status_code=404, detail="Group not found")
+        return fast_response(status)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/groups/{name}", response_model=Group)
+async def get_group_details(name: str, db = Depends(get_db), claims: dict = Depends(get_current_user)):
+    try:
+        group_service = GroupService(db)
+        group = await group_service.get_group_details(name)
+        if not group:
+            raise HTTPException(status_code=404, detail="Group not found")
+        return group
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.delete("/groups/{name}")
+async def delete_group(name: str, db = Depends(get_db), claims: dict = Depends(get_current_user)):
+    try:
+        group_service = GroupService(db)
+        await group_service.delete_group(name)
+        return {"message": "Group deleted successfully"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
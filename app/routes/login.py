@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel
+
+from app.services.login_service import LoginService
+from app.database import get_db
+from app.utils.auth_tokens import token_signer, get_current_user
+from app.utils import auth_tokens
+from app.utils.password_hasher import PasswordHasherBusy
+from app.utils.timing import TimedRoute
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(route_class=TimedRoute)
+
+class LoginRequest(BaseModel):
+    email: str
+    password: str
+
+class LoginResponse(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int
+    email: str
+
+@router.post("/login", response_model=LoginResponse)
+async def login(credentials: LoginRequest, db = Depends(get_db)):
+    try:
+        login_service = LoginService(db)
+        result = await login_service.authenticate_user(credentials.email, credentials.password)
+        if not result['isAuthenticated']:
+            raise HTTPException(status_code=401, detail=result['error'])
+        token = token_signer.issue(credentials.email, admin=bool(result['user'].get('admin')))
+        return LoginResponse(
+            access_token=token['access_token'],
+            expires_in=token_signer.ttl,
+            email=credentials.email
+        )
+    except HTTPException:
+        raise
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Too many login attempts, retry later", headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/logout")
+async def logout(claims: dict = Depends(get_current_user)):
+    await auth_tokens.revocation_list.revoke(claims)
+    return {"message": "Logged out"}
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.config import settings
+from app.utils.metrics import render_metrics
+from app.utils.timing import TimedRoute
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(route_class=TimedRoute)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics(scope: str = Query("all", pattern="^(all|worker)$")):
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    try:
+        return PlainTextResponse(await render_metrics(scope), media_type=PROMETHEUS_CONTENT_TYPE)
+    except Exception as e:
+        logger.error(f"Error rendering metrics: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
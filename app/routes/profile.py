@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, HTTPException
+from typing import List
+from pydantic import BaseModel
+
+from app.services.user_service import UserService
+from app.database import get_db
+from app.utils.auth_tokens import get_current_user
+from app.utils.timing import TimedRoute
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(route_class=TimedRoute)
+
+class Profile(BaseModel):
+    email: str
+    favourite_groups: List[str] = []
+
+@router.get("/profile", response_model=Profile)
+async def get_profile(db = Depends(get_db), claims: dict = Depends(get_current_user)):
+    try:
+        user_service = UserService(db)
+        user = await user_service.get_user_by_email(claims['sub'])
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        return user
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
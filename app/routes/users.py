@@ -0,0 +1,90 @@
+from fastapi import APIRouter, Depends, HTTPException, Body
+from typing import List
+from pydantic import BaseModel
+
+from app.services.user_service import UserService
+from app.database import get_db
+from app.utils.auth_tokens import get_current_user, get_admin_user
+from app.utils.password_hasher import PasswordHasherBusy
+from app.utils.timing import TimedRoute
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(route_class=TimedRoute)
+
+class UserCreate(BaseModel):
+    email: str
+    password: str
+
+class ChangePasswordRequest(BaseModel):
+    old_password: str
+    new_password: str
+
+@router.post("/users")
+async def add_new_user(user: UserCreate, db = Depends(get_db)):
+    try:
+        user_service = UserService(db)
+        if await user_service.get_user_by_email(user.email):
+            raise HTTPException(status_code=409, detail="User already exists")
+        new_user = await user_service.add_new_user(user.dict())
+        return {"email": new_user['email'], "favourite_groups": new_user['favourite_groups']}
+    except HTTPException:
+        raise
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Password service busy, retry later", headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/users", response_model=List[dict])
+async def get_all_users(db = Depends(get_db), claims: dict = Depends(get_admin_user)):
+    try:
+        user_service = UserService(db)
+        return await user_service.get_all_users()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.delete("/users/{email}")
+async def delete_user(email: str, db = Depends(get_db), claims: dict = Depends(get_current_user)):
+    try:
+        if email != claims['sub'] and not claims.get('admin'):
+            raise HTTPException(status_code=403, detail="Users can only delete their own account")
+        user_service = UserService(db)
+        await user_service.delete_user_by_email(email)
+        return {"message": "User deleted successfully"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/users/change_password")
+async def change_password(
+    request: ChangePasswordRequest,
+    db = Depends(get_db),
+    claims: dict = Depends(get_current_user)
+):
+    try:
+        user_service = UserService(db)
+        result = await user_service.change_password(claims['sub'], request.old_password, request.new_password)
+        if not result['success']:
+            raise HTTPException(status_code=400, detail=result['message'])
+        return result
+    except HTTPException:
+        raise
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Password service busy, retry later", headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/users/favourite_groups")
+async def save_favourite_groups(
+    favourite_groups: List[str] = Body(..., embed=True),
+    db = Depends(get_db),
+    claims: dict = Depends(get_current_user)
+):
+    try:
+        user_service = UserService(db)
+        return await user_service.save_user_favourite_groups(claims['sub'], favourite_groups)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
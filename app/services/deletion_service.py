@@ -0,0 +1,170 @@
+import asyncio
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+
+from app.config import settings
+from app.services.event_service import EventService
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+class DeletionJobService:
+    """Deletes business dates in bounded _id-ordered chunks from a background
+    runner. Progress is checkpointed on the job document, and jobs are
+    claimed through an expiring lease, so a job orphaned by a worker restart
+    is picked up again where it stopped."""
+
+    def __init__(self, db):
+        self.db = db
+        self.job_collection = self.db['deletion_jobs']
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    async def create_job(self, business_dates: List[str]) -> Dict[str, Any]:
+        now = datetime.utcnow()
+        job = {
+            'business_dates': sorted(set(business_dates)),
+            'status': 'pending',
+            'deleted': 0,
+            'last_id': None,
+            'owner': None,
+            'lease_expires_at': now,
+            'created_at': now,
+            'updated_at': now,
+            'error': None,
+        }
+        result = await self.job_collection.insert_one(job)
+        job['_id'] = result.inserted_id
+        return job
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            return await self.job_collection.find_one({'_id': ObjectId(job_id)})
+        except InvalidId:
+            return None
+
+    async def claim_job(self) -> Optional[Dict[str, Any]]:
+        now = datetime.utcnow()
+        return await self.job_collection.find_one_and_update(
+            {'status': {'$in': ['pending', 'running']}, 'lease_expires_at': {'$lte': now}},
+            {'$set': {
+                'status': 'running',
+                'owner': self.worker_id,
+                'lease_expires_at': now + timedelta(seconds=settings.DELETE_JOB_LEASE_SECONDS),
+                'updated_at': now,
+            }},
+            sort=[('created_at', 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def run_job(self, job: Dict[str, Any]):
+        event_service = EventService(self.db)
+        business_dates = job['business_dates']
+        last_id = job['last_id']
+        chunk_size = settings.DELETE_CHUNK_SIZE
+        rate = settings.DELETE_RATE_LIMIT_DOCS_PER_SECOND
+        try:
+            while True:
+                started = asyncio.get_running_loop().time()
+                deleted, last_id_in_chunk = await event_service.delete_events_chunk(business_dates, last_id, chunk_size)
+                if last_id_in_chunk is None:
+                    break
+                last_id = last_id_in_chunk
+                still_owner = await self._checkpoint(job['_id'], deleted, last_id)
+                if not still_owner:
+                    logger.warning(f"Lost lease on deletion job {job['_id']}, stopping")
+                    return
+                if rate:
+                    # Hold the chunk rate at or below the configured docs/second
+                    elapsed = asyncio.get_running_loop().time() - started
+                    await asyncio.sleep(max(chunk_size / rate - elapsed, 0))
+
+            await event_service.after_events_deleted(business_dates)
+            await self.job_collection.update_one(
+                {'_id': job['_id']},
+                {'$set': {'status': 'completed', 'owner': None, 'updated_at': datetime.utcnow()}}
+            )
+            logger.info(f"Deletion job {job['_id']} completed")
+        except Exception as e:
+            logger.error(f"Deletion job {job['_id']} failed: {str(e)}", exc_info=True)
+            await self.job_collection.update_one(
+                {'_id': job['_id']},
+                {'$set': {'status': 'failed', 'owner': None, 'error': str(e), 'updated_at': datetime.utcnow()}}
+            )
+
+    async def _checkpoint(self, job_id: ObjectId, deleted: int, last_id: ObjectId) -> bool:
+        now = datetime.utcnow()
+        result = await self.job_collection.update_one(
+            {'_id': job_id, 'owner': self.worker_id},
+            {
+                '$inc': {'deleted': deleted},
+                '$set': {
+                    'last_id': last_id,
+                    'lease_expires_at': now + timedelta(seconds=settings.DELETE_JOB_LEASE_SECONDS),
+                    'updated_at': now,
+                },
+            }
+        )
+        return result.matched_count == 1
+
+class DeletionJobRunner:
+    def __init__(self, db):
+        self.service = DeletionJobService(db)
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def wakeup(self):
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            try:
+                job = await self.service.claim_job()
+                if job is not None:
+                    await self.service.run_job(job)
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Deletion job runner error: {str(e)}", exc_info=True)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.DELETE_JOB_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+_deletion_runner: Optional[DeletionJobRunner] = None
+
+def get_deletion_runner() -> Optional[DeletionJobRunner]:
+    return _deletion_runner
+
+async def start_deletion_runner(db):
+    global _deletion_runner
+    if _deletion_runner is not None:
+        return
+    _deletion_runner = DeletionJobRunner(db)
+    _deletion_runner.start()
+
+async def stop_deletion_runner():
+    global _deletion_runner
+    if _deletion_runner is None:
+        return
+    await _deletion_runner.stop()
+    _deletion_runner = None
@@ -0,0 +1,134 @@
+import asyncio
+import time
+from typing import List, Dict, Any, Optional, Tuple
+
+from app.config import settings
+from app.services.event_service import EventService
+from app.utils.batching import MicroBatcher
+from app.utils.metrics import registry
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+FLUSH_SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+event_buffer_flush_size = registry.histogram(
+    'event_buffer_flush_size', 'Events per write-behind buffer flush.', buckets=FLUSH_SIZE_BUCKETS)
+event_buffer_flush_latency = registry.histogram(
+    'event_buffer_flush_latency_seconds', 'Time spent writing one write-behind buffer flush.')
+event_buffer_queue_depth = registry.gauge('event_buffer_queue_depth', 'Events waiting in the write-behind buffer.')
+event_buffer_rejected = registry.counter(
+    'event_buffer_rejected_total', 'Event inserts shed because the write-behind buffer was full.')
+
+class EventBufferFull(Exception):
+    pass
+
+class EventWriteBuffer:
+    """Per-worker write-behind buffer that coalesces single event inserts
+    into one unordered insert_many per flush."""
+
+    def __init__(self, db, max_batch_size: int, max_latency_ms: int, max_pending: int):
+        self.db = db
+        self.max_pending = max_pending
+        self._batcher = MicroBatcher(self._flush, max_batch_size, max_latency_ms)
+
+        self.flushes = 0
+        self.events_flushed = 0
+        self.events_failed = 0
+        self.rejected = 0
+        self.last_flush_size = 0
+        self.last_flush_latency_ms = 0.0
+        self.max_flush_latency_ms = 0.0
+        self.total_flush_latency_ms = 0.0
+
+    def start(self):
+        self._batcher.start()
+
+    async def stop(self):
+        await self._batcher.stop()
+
+    async def submit(self, event_data: Dict[str, Any]) -> Dict[str, Any]:
+        if self._batcher.closing or len(self._batcher) >= self.max_pending:
+            self.rejected += 1
+            event_buffer_rejected.inc()
+            raise EventBufferFull()
+        future = asyncio.get_running_loop().create_future()
+        self._batcher.add((event_data, future))
+        event_buffer_queue_depth.inc()
+        return await future
+
+    async def _flush(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        event_buffer_queue_depth.dec(len(batch))
+        start_time = time.monotonic()
+        try:
+            results = await EventService(self.db).insert_events([event_data for event_data, _ in batch])
+        except Exception as e:
+            logger.error(f"Error flushing event buffer: {str(e)}", exc_info=True)
+            self.events_failed += len(batch)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._record_flush(len(batch), (time.monotonic() - start_time) * 1000)
+
+        for (event_data, future), result in zip(batch, results):
+            if result['success']:
+                self.events_flushed += 1
+                if not future.done():
+                    future.set_result(event_data)
+            else:
+                self.events_failed += 1
+                if not future.done():
+                    future.set_exception(Exception(result['error']))
+
+    def _record_flush(self, size: int, latency_ms: float):
+        self.flushes += 1
+        self.last_flush_size = size
+        self.last_flush_latency_ms = latency_ms
+        self.max_flush_latency_ms = max(self.max_flush_latency_ms, latency_ms)
+        self.total_flush_latency_ms += latency_ms
+        event_buffer_flush_size.observe(size)
+        event_buffer_flush_latency.observe(latency_ms / 1000)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'queue_depth': len(self._batcher),
+            'max_pending': self.max_pending,
+            'flushes': self.flushes,
+            'events_flushed': self.events_flushed,
+            'events_failed': self.events_failed,
+            'rejected': self.rejected,
+            'last_flush_size': self.last_flush_size,
+            'avg_flush_size': (self.events_flushed + self.events_failed) / self.flushes if self.flushes else 0,
+            'last_flush_latency_ms': self.last_flush_latency_ms,
+            'max_flush_latency_ms': self.max_flush_latency_ms,
+            'avg_flush_latency_ms': self.total_flush_latency_ms / self.flushes if self.flushes else 0,
+        }
+
+_event_buffer: Optional[EventWriteBuffer] = None
+
+def get_event_buffer() -> Optional[EventWriteBuffer]:
+    return _event_buffer
+
+async def start_event_buffer(db):
+    global _event_buffer
+    if not settings.EVENT_BUFFER_ENABLED or _event_buffer is not None:
+        return
+    _event_buffer = EventWriteBuffer(
+        db,
+        max_batch_size=settings.EVENT_BUFFER_MAX_BATCH_SIZE,
+        max_latency_ms=settings.EVENT_BUFFER_MAX_LATENCY_MS,
+        max_pending=settings.EVENT_BUFFER_MAX_PENDING,
+    )
+    _event_buffer.start()
+    logger.info("Event write-behind buffer started")
+
+async def stop_event_buffer():
+    global _event_buffer
+    if _event_buffer is None:
+        return
+    await _event_buffer.stop()
+    _event_buffer = None
+    logger.info("Event write-behind buffer stopped")
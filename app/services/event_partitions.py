@@ -0,0 +1,98 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Iterable, Set
+
+from app.config import settings
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+EVENTS_COLLECTION = 'events'
+DATE_FORMAT = '%Y-%m-%d'
+EPOCH = datetime(1970, 1, 1)
+
+# Partitions whose indexes this process has already reconciled
+_indexed_partitions: Set[str] = set()
+
+class EventPartitioner:
+    """Maps a businessDate to the events collection that stores it.
+
+    With EVENT_PARTITIONING='none' everything lives in 'events'. 'month'
+    routes to events_YYYY_MM and 'days' to events_YYYYMMDD buckets of
+    EVENT_PARTITION_DAYS days, so retention becomes a collection drop."""
+
+    def __init__(self, db, mode: str = None, days: int = None):
+        self.db = db
+        self.mode = mode or settings.EVENT_PARTITIONING
+        self.days = days or settings.EVENT_PARTITION_DAYS
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != 'none'
+
+    def collection_name(self, business_date: str) -> str:
+        if self.mode == 'month':
+            return f"{EVENTS_COLLECTION}_{business_date[:4]}_{business_date[5:7]}"
+        if self.mode == 'days':
+            return f"{EVENTS_COLLECTION}_{self.partition_start(business_date).replace('-', '')}"
+        return EVENTS_COLLECTION
+
+    def partition_start(self, business_date: str) -> str:
+        """First business date stored in business_date's partition."""
+        if self.mode == 'month':
+            return f"{business_date[:7]}-01"
+        if self.mode == 'days':
+            day = (datetime.strptime(business_date, DATE_FORMAT) - EPOCH).days
+            return (EPOCH + timedelta(days=day - day % self.days)).strftime(DATE_FORMAT)
+        return business_date
+
+    def group_by_collection(self, business_dates: Iterable[str]) -> Dict[str, List[str]]:
+        groups = defaultdict(list)
+        for business_date in business_dates:
+            groups[self.collection_name(business_date)].append(business_date)
+        return dict(groups)
+
+    def collection_names_for_range(self, start_date: str, end_date: str) -> List[str]:
+        start = datetime.strptime(start_date, DATE_FORMAT)
+        end = datetime.strptime(end_date, DATE_FORMAT)
+        names = []
+        for offset in range((end - start).days + 1):
+            name = self.collection_name((start + timedelta(days=offset)).strftime(DATE_FORMAT))
+            if name not in names:
+                names.append(name)
+        return names
+
+    def aggregate_across(self, collection_names: List[str], match: Dict[str, Any], pipeline: List[Dict[str, Any]], **kwargs):
+        # Fan out with $unionWith so the rest of the pipeline sees one stream
+        stages = [{'$match': match}]
+        for name in collection_names[1:]:
+            stages.append({'$unionWith': {'coll': name, 'pipeline': [{'$match': match}]}})
+        return self.db[collection_names[0]].aggregate(stages + pipeline, **kwargs)
+
+    async def list_partitions(self) -> List[str]:
+        names = await self.db.list_collection_names(filter={'name': {'$regex': f'^{EVENTS_COLLECTION}_\\d'}})
+        return sorted(names)
+
+    async def ensure_indexes(self, collection_name: str):
+        if not self.enabled or collection_name in _indexed_partitions:
+            return
+        from app.services.index_service import IndexService, INDEXES
+
+        await IndexService(self.db, {collection_name: INDEXES[EVENTS_COLLECTION]}).reconcile()
+        _indexed_partitions.add(collection_name)
+
+    async def drop_partitions_before(self, business_date: str) -> List[str]:
+        """Drop partitions that only hold dates before business_date."""
+        if not self.enabled:
+            return []
+        keep_from = self.collection_name(business_date)
+        dropped = []
+        for name in await self.list_partitions():
+            if name < keep_from:
+                await self.db.drop_collection(name)
+                _indexed_partitions.discard(name)
+                dropped.append(name)
+        if dropped:
+            logger.info(f"Dropped event partitions: {dropped}")
+        return dropped
@@ -1,78 +1,364 @@
 from datetime import datetime, timedelta
+import base64
+import binascii
 import uuid
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, AsyncIterator
 from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo.errors import BulkWriteError
+from pymongo.write_concern import WriteConcern
+
+from app.database import get_write_concern
+from app.config import settings
+from app.services.event_partitions import EventPartitioner
+from app.services.expectation_engine import ExpectationEngine
+from app.services.group_status import get_group_status_tracker
+from app.services.rabbitmq_publisher import EventPublisherUnavailable, get_event_publisher
+from app.services.rollup_service import MonthlyRollupService
+from app.services.running_statistics import get_running_statistics_recorder, summarize
+from app.services.sla_evaluator import get_sla_evaluator, sla_scope
+from app.utils.cache import get_stats_cache
+from app.utils.response_cache import bump_business_date_versions, invalidate_all_business_dates
+from app.utils.timing import span, timed
+
+STATS_CACHE_NAMESPACE = 'stats'
 
 import logging
 
 logger = logging.getLogger(__name__)
 
+EVENT_PROJECTION = {
+    '_id': 0,
+    'businessDate': 1,
+    'eventName': 1,
+    'eventType': 1,
+    'batchOrRealtime': 1,
+    'eventTime': 1,
+    'eventStatus': 1,
+    'resource': 1,
+    'details': 1,
+    'eventId': 1,
+}
+
+class InvalidPageCursor(ValueError):
+    pass
+
 class EventService:
-    def __init__(self, db):
+    def __init__(self, db, write_concern: Optional[WriteConcern] = None):
         self.db = db
-        self.event_collection = self.db['events']
+        self.write_concern = write_concern or get_write_concern()
+        self.partitioner = EventPartitioner(db)
         self.stats_collection = self.db['event_statistics']
         self.process_stats_collection = self.db['process_statistics']
 
+    def _collection(self, name: str):
+        collection = self.db[name]
+        if self.write_concern is not None:
+            collection = collection.with_options(write_concern=self.write_concern)
+        return collection
+
+    def events_for(self, business_date: str):
+        return self._collection(self.partitioner.collection_name(business_date))
+
+    @staticmethod
+    def prepare_event_data(event_data: Dict[str, Any]) -> Dict[str, Any]:
+        event_data = dict(event_data)
+        event_data['eventId'] = f"EVT#{event_data['eventName']}#{event_data['eventStatus']}#{str(uuid.uuid4())}"
+        event_data['type'] = 'event'
+        event_data['timestamp'] = datetime.now().isoformat()
+        return event_data
+
+    @timed('db')
     async def query_events_by_date(self, business_date: str) -> List[Dict[str, Any]]:
-        return await self.event_collection.find({'businessDate': business_date}).to_list(None)
+        return await self.events_for(business_date).find({'businessDate': business_date, 'type': 'event'}, EVENT_PROJECTION).to_list(None)
 
+    async def iter_events_by_date(self, business_date: str, batch_size: int) -> AsyncIterator[Dict[str, Any]]:
+        cursor = self.events_for(business_date).find({'businessDate': business_date, 'type': 'event'}, EVENT_PROJECTION).batch_size(batch_size)
+        async for event in cursor:
+            yield event
+
+    @timed('db')
+    async def query_events_page(self, business_date: str, after: Optional[str], limit: int):
+        query = {'businessDate': business_date, 'type': 'event'}
+        if after:
+            query['_id'] = {'$gt': self.decode_page_cursor(after)}
+        events = await self.events_for(business_date).find(query, {**EVENT_PROJECTION, '_id': 1}).sort('_id', 1).limit(limit).to_list(limit)
+        next_cursor = self.encode_page_cursor(events[-1]['_id']) if len(events) == limit else None
+        for event in events:
+            del event['_id']
+        return events, next_cursor
+
+    @staticmethod
+    def encode_page_cursor(last_id: ObjectId) -> str:
+        return base64.urlsafe_b64encode(last_id.binary).decode('ascii').rstrip('=')
+
+    @staticmethod
+    def decode_page_cursor(cursor: str) -> ObjectId:
+        try:
+            return ObjectId(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        except (binascii.Error, InvalidId, TypeError, ValueError):
+            raise InvalidPageCursor(f"Invalid page cursor: {cursor}")
+
+    @timed('db')
     async def query_events_by_date_for_chart(self, business_date: str) -> List[Dict[str, Any]]:
-        # Implement the logic to query and format events for chart
-        pass
+        pipeline = self.chart_pipeline(business_date)
+        return await self.events_for(business_date).aggregate(pipeline).to_list(None)
+
+    @staticmethod
+    def chart_pipeline(business_date: str) -> List[Dict[str, Any]]:
+        # Rows are grouped per eventName so each STARTED can be paired with the
+        # first SUCCESS/FAILED at or after it, and each expectation with the
+        # first actual event of the same status, without leaving the server.
+        is_event = {'$eq': ['$$row.type', 'event']}
+        return [
+            {'$match': {'businessDate': business_date, 'type': {'$in': ['event', 'expectation']}}},
+            {'$project': {
+                '_id': 0,
+                'eventId': 1,
+                'eventType': {'$ifNull': ['$eventType', '']},
+                'type': 1,
+                'eventName': 1,
+                'eventStatus': 1,
+                'eventTime': {'$toDate': '$eventTime'},
+                'expectedLatestTime': {'$toDate': '$expectedLatestTime'},
+            }},
+            {'$sort': {'eventTime': 1}},
+            {'$group': {'_id': '$eventName', 'rows': {'$push': '$$ROOT'}}},
+            {'$project': {'rows': {'$map': {
+                'input': '$rows',
+                'as': 'current',
+                'in': {'$mergeObjects': ['$$current', {'match': {'$first': {'$filter': {
+                    'input': '$rows',
+                    'as': 'row',
+                    'cond': {'$cond': [
+                        {'$eq': ['$$current.type', 'expectation']},
+                        {'$and': [is_event, {'$eq': ['$$row.eventStatus', '$$current.eventStatus']}]},
+                        {'$and': [
+                            is_event,
+                            {'$in': ['$$row.eventStatus', ['SUCCESS', 'FAILED']]},
+                            {'$gte': ['$$row.eventTime', '$$current.eventTime']},
+                        ]},
+                    ]},
+                }}}}]},
+            }}}},
+            {'$unwind': '$rows'},
+            {'$replaceRoot': {'newRoot': '$rows'}},
+            {'$project': {
+                'eventId': 1,
+                'eventType': 1,
+                'type': 1,
+                'eventName': 1,
+                'eventKey': {'$concat': ['$eventName', '#', '$eventStatus']},
+                'eventStatus': 1,
+                'TimeValue': {'$dateToString': {'date': '$eventTime', 'format': '%Y-%m-%dT%H:%M:%S'}},
+                'outcomeStatus': {'$switch': {
+                    'branches': [
+                        {'case': {'$eq': ['$type', 'expectation']}, 'then': {'$cond': [
+                            {'$not': ['$match']},
+                            'PENDING',
+                            # Expectations are on time up to their latest time, not the median
+                            {'$cond': [
+                                {'$lte': ['$match.eventTime', {'$ifNull': ['$expectedLatestTime', '$eventTime']}]},
+                                'ON_TIME',
+                                'LATE',
+                            ]},
+                        ]}},
+                        {'case': {'$ne': ['$eventStatus', 'STARTED']}, 'then': '$eventStatus'},
+                    ],
+                    'default': {'$ifNull': ['$match.eventStatus', 'RUNNING']},
+                }},
+                'plotStatus': {'$cond': [{'$eq': ['$type', 'expectation']}, 'EXPECTED', 'ACTUAL']},
+            }},
+            {'$sort': {'eventName': 1, 'TimeValue': 1}},
+        ]
 
+    @timed('db')
     async def get_monthly_events(self, event_name: str, event_status: str) -> Dict[str, List[Dict[str, Any]]]:
-        # Implement the logic to get monthly events
-        pass
+        events = await MonthlyRollupService(self.db).get_recent(event_name, event_status, settings.EVENT_DETAILS_DAYS)
+        return {'events': events}
 
     async def insert_event(self, event_data: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            logger.info(f"Attempting to insert event: {event_data}")
-            result = await self.event_collection.insert_one(event_data)
-            logger.info(f"Insert result: {result.inserted_id}")
-            inserted_event = await self.event_collection.find_one({'_id': result.inserted_id})
-            logger.info(f"Retrieved inserted event: {inserted_event}")
-            return inserted_event
+            collection_name = self.partitioner.collection_name(event_data['businessDate'])
+            with span('db'):
+                await self.partitioner.ensure_indexes(collection_name)
+                result = await self._collection(collection_name).insert_one(event_data)
+            event_data['_id'] = result.inserted_id
+            logger.debug(f"Inserted event {event_data['eventId']} as {result.inserted_id}")
+            await self._record_accepted([event_data])
+            return event_data
         except Exception as e:
             logger.error(f"Error inserting event: {str(e)}", exc_info=True)
             raise
 
+    async def insert_events(self, events_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not events_data:
+            return []
+        results = [{'eventId': event['eventId'], 'success': True, 'error': None} for event in events_data]
+        indexes_by_collection = {}
+        for index, event in enumerate(events_data):
+            collection_name = self.partitioner.collection_name(event['businessDate'])
+            indexes_by_collection.setdefault(collection_name, []).append(index)
+
+        for collection_name, indexes in indexes_by_collection.items():
+            try:
+                with span('db'):
+                    await self.partitioner.ensure_indexes(collection_name)
+                    await self._collection(collection_name).insert_many([events_data[index] for index in indexes], ordered=False)
+            except BulkWriteError as e:
+                write_errors = e.details.get('writeErrors', [])
+                logger.error(f"Batch insert had {len(write_errors)} failed writes out of {len(indexes)}")
+                for error in write_errors:
+                    results[indexes[error['index']]]['success'] = False
+                    results[indexes[error['index']]]['error'] = error.get('errmsg')
+        await self._record_accepted([event for event, result in zip(events_data, results) if result['success']])
+        return results
+
+    async def _record_accepted(self, events_data: List[Dict[str, Any]]):
+        await bump_business_date_versions(event['businessDate'] for event in events_data)
+        get_group_status_tracker().record(events_data)
+        recorder = get_running_statistics_recorder()
+        if recorder is not None:
+            recorder.record(events_data)
+        evaluator = get_sla_evaluator()
+        if evaluator is not None:
+            evaluator.record(events_data)
+        if settings.EVENT_ROLLUPS_ENABLED:
+            try:
+                await MonthlyRollupService(self.db).record(events_data)
+            except Exception as e:
+                logger.error(f"Error updating monthly rollups: {str(e)}", exc_info=True)
+
+    @staticmethod
+    def _with_running_summary(stat: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if stat and 'running' in stat:
+            stat['running'] = summarize(stat['running'], settings.RUNNING_STATS_BUCKET_SECONDS)
+        return stat
+
     async def publish_event_to_rabbitmq(self, event_data: Dict[str, Any]):
-        # Implement RabbitMQ publishing logic
-        pass
+        publisher = get_event_publisher()
+        if publisher is None:
+            raise EventPublisherUnavailable("RabbitMQ publisher is not configured")
+        await publisher.publish(event_data)
 
     async def delete_expectations_for_business_date(self, business_date: str):
-        await self.event_collection.delete_many({
+        await self.events_for(business_date).delete_many({
             'businessDate': business_date,
-            'eventId': {'$regex': '^EXP#'}
+            'type': 'expectation'
         })
+        await bump_business_date_versions([business_date])
 
-    async def generate_expectations(self, business_date: str) -> bool:
-        # Implement expectation generation logic
-        pass
+    async def generate_expectations(self, business_date: str, end_date: Optional[str] = None) -> bool:
+        generated = await ExpectationEngine(self.db).generate_expectations(business_date, end_date)
+        await self._invalidate_stats_cache()
+        business_dates = ExpectationEngine.business_date_range(business_date, end_date or business_date)
+        self._forget_sla_state(business_dates)
+        await bump_business_date_versions(business_dates + [sla_scope(date) for date in business_dates])
+        return generated > 0
 
     async def delete_events_for_business_dates(self, business_dates: List[str]):
-        await self.event_collection.delete_many({
+        for collection_name, dates in self.partitioner.group_by_collection(business_dates).items():
+            await self._collection(collection_name).delete_many(self.deletable_events_query(dates))
+        await self.after_events_deleted(business_dates)
+
+    @staticmethod
+    def deletable_events_query(business_dates: List[str]) -> Dict[str, Any]:
+        return {
             'businessDate': {'$in': business_dates},
             'type': {'$in': ['event', 'outcome']}
-        })
+        }
+
+    async def delete_events_chunk(self, business_dates: List[str], after_id: Optional[ObjectId], chunk_size: int):
+        partitions = self.partitioner.group_by_collection(business_dates)
+        for collection_name, dates in sorted(partitions.items()):
+            collection = self._collection(collection_name)
+            query = self.deletable_events_query(dates)
+            # _id order only spans one collection; across partitions the
+            # deleted documents simply stop matching
+            if after_id is not None and len(partitions) == 1:
+                query['_id'] = {'$gt': after_id}
+            docs = await collection.find(query, {'_id': 1}).sort('_id', 1).limit(chunk_size).to_list(chunk_size)
+            if docs:
+                ids = [doc['_id'] for doc in docs]
+                result = await collection.delete_many({'_id': {'$in': ids}})
+                return result.deleted_count, ids[-1]
+        return 0, None
+
+    async def after_events_deleted(self, business_dates: List[str]):
+        if settings.EVENT_ROLLUPS_ENABLED:
+            await MonthlyRollupService(self.db).remove_business_dates(business_dates)
+        await self._invalidate_stats_cache()
+        self._forget_sla_state(business_dates)
+        await bump_business_date_versions(business_dates + [sla_scope(date) for date in business_dates])
+
+    @staticmethod
+    def _forget_sla_state(business_dates: List[str]):
+        evaluator = get_sla_evaluator()
+        if evaluator is not None:
+            evaluator.forget(business_dates)
+
+    @timed('db')
+    async def get_sla_outcomes(self, business_date: str) -> Dict[str, Any]:
+        collection = self.events_for(business_date)
+        expected = await collection.count_documents({'businessDate': business_date, 'type': 'expectation'})
+        outcomes = await collection.find(
+            {'businessDate': business_date, 'type': 'outcome'},
+            {'_id': 0, 'eventName': 1, 'eventStatus': 1, 'outcomeStatus': 1, 'deadline': 1, 'arrivalTime': 1}
+        ).sort([('eventName', 1), ('eventStatus', 1)]).to_list(None)
+        summary = {'ON_TIME': 0, 'LATE': 0, 'MISSING': 0}
+        for outcome in outcomes:
+            summary[outcome['outcomeStatus']] = summary.get(outcome['outcomeStatus'], 0) + 1
+        summary['PENDING'] = max(expected - len(outcomes), 0)
+        return {'businessDate': business_date, 'expected': expected, 'summary': summary, 'outcomes': outcomes}
+
+    async def drop_partitions_before(self, business_date: str) -> List[str]:
+        dropped = await self.partitioner.drop_partitions_before(business_date)
+        if dropped:
+            if settings.EVENT_ROLLUPS_ENABLED:
+                # Everything before the oldest kept partition is gone
+                await MonthlyRollupService(self.db).remove_business_dates_before(
+                    self.partitioner.partition_start(business_date))
+            await self._invalidate_stats_cache()
+            await invalidate_all_business_dates()
+        return dropped
+
+    async def rebuild_monthly_rollups(self, month: str):
+        await MonthlyRollupService(self.db).rebuild_month(month)
+
+    async def _cached(self, key: str, loader):
+        cache = get_stats_cache()
+        loader = timed('db')(loader)
+        if cache is None:
+            return await loader()
+        return await cache.get_or_load(STATS_CACHE_NAMESPACE, key, loader)
+
+    async def _invalidate_stats_cache(self):
+        cache = get_stats_cache()
+        if cache is not None:
+            await cache.invalidate(STATS_CACHE_NAMESPACE)
 
     async def get_latest_metrics(self) -> List[Dict[str, Any]]:
-        return await self.stats_collection.find().to_list(None)
+        async def load():
+            stats = await self.stats_collection.find().to_list(None)
+            return [self._with_running_summary(stat) for stat in stats]
+        return await self._cached('latest_metrics', load)
 
     async def update_expected_times(self):
-        # Implement logic to update expected times
-        pass
+        await ExpectationEngine(self.db).update_statistics()
+        await self._invalidate_stats_cache()
 
     async def get_expected_time(self, event_name: str, event_status: str) -> Dict[str, Any]:
-        return await self.stats_collection.find_one({
-            'event_name': event_name,
-            'event_status': event_status
-        })
+        async def load():
+            stat = await self.stats_collection.find_one({
+                'event_name': event_name,
+                'event_status': event_status
+            })
+            return self._with_running_summary(stat)
+        return await self._cached(f'expected_time:{event_name}:{event_status}', load)
 
     async def get_expectation_list(self) -> List[Dict[str, Any]]:
-        return await self.stats_collection.find().to_list(None)
+        return await self._cached('expectation_list', lambda: self.stats_collection.find().to_list(None))
 
     async def get_process_stats_list(self) -> List[Dict[str, Any]]:
-        return await self.process_stats_collection.find().to_list(None)
\ No newline at end of file
+        return await self._cached('process_stats_list', lambda: self.process_stats_collection.find().to_list(None))
\ No newline at end of file
@@ -0,0 +1,181 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+from pymongo import InsertOne, DeleteMany, UpdateOne
+
+from app.config import settings
+from app.services.event_partitions import EventPartitioner
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+DATE_FORMAT = '%Y-%m-%d'
+
+class ExpectationEngine:
+    """Computes expected time-of-day statistics per (eventName, eventStatus)
+    from event history and writes expectation documents from them.
+
+    History is loaded as columnar arrays and every group is reduced in one
+    vectorised pass instead of looping per event name."""
+
+    def __init__(self, db, lookback_days: Optional[int] = None):
+        self.db = db
+        self.partitioner = EventPartitioner(db)
+        self.stats_collection = self.db['event_statistics']
+        self.lookback_days = lookback_days or settings.EXPECTATION_LOOKBACK_DAYS
+
+    async def load_history(self, end_date: str) -> Dict[str, np.ndarray]:
+        start_date = (datetime.strptime(end_date, DATE_FORMAT) - timedelta(days=self.lookback_days)).strftime(DATE_FORMAT)
+        cursor = self.partitioner.aggregate_across(
+            self.partitioner.collection_names_for_range(start_date, end_date),
+            {'type': 'event', 'businessDate': {'$gte': start_date, '$lt': end_date}},
+            [{'$project': {
+                '_id': 0,
+                'eventName': 1,
+                'eventStatus': 1,
+                'offset': {'$subtract': [
+                    {'$toDate': '$eventTime'},
+                    {'$dateFromString': {'dateString': '$businessDate', 'format': DATE_FORMAT}},
+                ]},
+            }}],
+            batchSize=10000
+        )
+
+        names, statuses, offsets = [], [], []
+        async for row in cursor:
+            names.append(row['eventName'])
+            statuses.append(row['eventStatus'])
+            offsets.append(row['offset'])
+        return {
+            'eventName': np.array(names, dtype=object),
+            'eventStatus': np.array(statuses, dtype=object),
+            'offsetSeconds': np.array(offsets, dtype=np.float64) / 1000,
+        }
+
+    @staticmethod
+    def compute_statistics(history: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+        offsets = history['offsetSeconds']
+        if offsets.size == 0:
+            return []
+
+        names, name_index = np.unique(history['eventName'], return_inverse=True)
+        statuses, status_index = np.unique(history['eventStatus'], return_inverse=True)
+        unique_keys, group = np.unique(name_index * len(statuses) + status_index, return_inverse=True)
+
+        order = np.lexsort((offsets, group))
+        values = offsets[order]
+        sorted_group = group[order]
+        counts = np.bincount(group, minlength=len(unique_keys))
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+        def quantile(q: float) -> np.ndarray:
+            position = starts + q * (counts - 1)
+            low = np.floor(position).astype(np.int64)
+            high = np.ceil(position).astype(np.int64)
+            return values[low] + (values[high] - values[low]) * (position - low)
+
+        mean = np.add.reduceat(values, starts) / counts
+        deviation = values - mean[sorted_group]
+        stddev = np.sqrt(np.add.reduceat(deviation * deviation, starts) / counts)
+        median = quantile(0.5)
+        p90 = quantile(0.9)
+        # Running sums are kept around the group mean (see RunningStatisticsRecorder)
+        sums = np.add.reduceat(deviation, starts)
+        sum_squares = np.add.reduceat(deviation * deviation, starts)
+
+        # Seed the incrementally maintained running aggregates from the same history
+        bucket_seconds = settings.RUNNING_STATS_BUCKET_SECONDS
+        buckets = np.floor(values / bucket_seconds).astype(np.int64)
+        pairs, pair_counts = np.unique(np.stack((sorted_group, buckets)), axis=1, return_counts=True)
+        histograms = [{} for _ in unique_keys]
+        for index, bucket, bucket_count in zip(pairs[0].tolist(), pairs[1].tolist(), pair_counts.tolist()):
+            histograms[index][str(bucket)] = bucket_count
+
+        statistics = []
+        for index, key in enumerate(unique_keys):
+            statistics.append({
+                'event_name': names[key // len(statuses)],
+                'event_status': statuses[key % len(statuses)],
+                'expected_time': ExpectationEngine.format_offset(median[index]),
+                'median_seconds': float(median[index]),
+                'p90_seconds': float(p90[index]),
+                'mean_seconds': float(mean[index]),
+                'stddev_seconds': float(stddev[index]),
+                'sample_count': int(counts[index]),
+                'running': {
+                    'shift': float(mean[index]),
+                    'count': int(counts[index]),
+                    'sum': float(sums[index]),
+                    'sum_squares': float(sum_squares[index]),
+                    'histogram': histograms[index],
+                },
+            })
+        return statistics
+
+    @staticmethod
+    def format_offset(seconds: float) -> str:
+        # Offsets past midnight of the business date keep counting hours (e.g. 25:30:00)
+        seconds = int(round(seconds))
+        return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+    async def update_statistics(self, end_date: Optional[str] = None) -> List[Dict[str, Any]]:
+        end_date = end_date or datetime.now().strftime(DATE_FORMAT)
+        statistics = self.compute_statistics(await self.load_history(end_date))
+        if not statistics:
+            return []
+
+        updated_at = datetime.now().isoformat()
+        await self.stats_collection.bulk_write([
+            UpdateOne(
+                {'event_name': stat['event_name'], 'event_status': stat['event_status']},
+                {'$set': {**stat, 'lookback_days': self.lookback_days, 'updated_at': updated_at}},
+                upsert=True
+            )
+            for stat in statistics
+        ], ordered=False)
+        logger.info(f"Updated expected times for {len(statistics)} event/status pairs")
+        return statistics
+
+    async def generate_expectations(self, start_date: str, end_date: Optional[str] = None) -> int:
+        business_dates = self.business_date_range(start_date, end_date or start_date)
+        statistics = await self.update_statistics(business_dates[0])
+        if not statistics:
+            return 0
+
+        generated = 0
+        for collection_name, dates in self.partitioner.group_by_collection(business_dates).items():
+            requests = [DeleteMany({'businessDate': {'$in': dates}, 'type': 'expectation'})]
+            for business_date in dates:
+                midnight = datetime.strptime(business_date, DATE_FORMAT)
+                for stat in statistics:
+                    requests.append(InsertOne(self.build_expectation(business_date, midnight, stat)))
+            await self.partitioner.ensure_indexes(collection_name)
+            await self.db[collection_name].bulk_write(requests, ordered=True)
+            generated += len(requests) - 1
+        logger.info(f"Generated {generated} expectations for {len(business_dates)} business dates")
+        return generated
+
+    @staticmethod
+    def build_expectation(business_date: str, midnight: datetime, stat: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'type': 'expectation',
+            'businessDate': business_date,
+            'eventName': stat['event_name'],
+            'eventStatus': stat['event_status'],
+            'eventTime': midnight + timedelta(seconds=stat['median_seconds']),
+            'expectedLatestTime': midnight + timedelta(seconds=stat['p90_seconds']),
+            'sampleCount': stat['sample_count'],
+            'eventId': f"EXP#{stat['event_name']}#{stat['event_status']}#{str(uuid.uuid4())}",
+            'timestamp': datetime.now().isoformat(),
+        }
+
+    @staticmethod
+    def business_date_range(start_date: str, end_date: str) -> List[str]:
+        start = datetime.strptime(start_date, DATE_FORMAT)
+        end = datetime.strptime(end_date, DATE_FORMAT)
+        if end < start:
+            raise ValueError(f"end date {end_date} is before start date {start_date}")
+        return [(start + timedelta(days=offset)).strftime(DATE_FORMAT) for offset in range((end - start).days + 1)]
@@ -1,5 +1,8 @@
 from typing import List, Dict, Any
 from bson import ObjectId
+from pymongo import ReturnDocument
+
+from app.services.group_status import invalidate_groups
 
 class GroupService:
     def __init__(self, db):
@@ -10,15 +13,18 @@ class GroupService:
         return await self.group_collection.find().to_list(None)
 
     async def save_group(self, name: str, events: List[str], description: str) -> Dict[str, Any]:
-        result = await self.group_collection.update_one(
+        group = await self.group_collection.find_one_and_update(
             {'name': name},
             {'$set': {'events': events, 'description': description}},
-            upsert=True
+            upsert=True,
+            return_document=ReturnDocument.AFTER
         )
-        return await self.group_collection.find_one({'name': name})
+        await invalidate_groups()
+        return group
 
     async def delete_group(self, name: str):
         await self.group_collection.delete_one({'name': name})
+        await invalidate_groups()
 
     async def get_group_details(self, name: str) -> Dict[str, Any]:
         return await self.group_collection.find_one({'name': name})
\ No newline at end of file
@@ -0,0 +1,211 @@
+from collections import OrderedDict
+from typing import List, Dict, Any, Iterable, Optional, Set
+
+from app.config import settings
+from app.services.event_partitions import EventPartitioner
+from app.services.sla_evaluator import naive_utc
+from app.utils.cache import get_stats_cache
+from app.utils.response_cache import get_business_date_version
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+GROUPS_CACHE_NAMESPACE = 'groups'
+
+NOT_STARTED = 'NOT_STARTED'
+
+class GroupIndex:
+    """Groups by name plus the inverted eventName -> group names index.
+
+    The groups list comes from the two-tier stats cache, so a save or
+    delete anywhere invalidates every worker; the index is rebuilt only
+    when the cached list object changes."""
+
+    def __init__(self):
+        self._source: Optional[List[Dict[str, Any]]] = None
+        self.generation = 0
+        self.groups: Dict[str, Dict[str, Any]] = {}
+        self.groups_by_event: Dict[str, Set[str]] = {}
+
+    async def refresh(self, db) -> 'GroupIndex':
+        async def load():
+            return await db['groups'].find({}, {'_id': 0, 'name': 1, 'events': 1, 'description': 1}).to_list(None)
+
+        cache = get_stats_cache()
+        groups = await (cache.get_or_load(GROUPS_CACHE_NAMESPACE, 'all', load) if cache is not None else load())
+        if groups is self._source:
+            return self
+        groups_by_event: Dict[str, Set[str]] = {}
+        for group in groups:
+            for event_name in group.get('events', []):
+                groups_by_event.setdefault(event_name, set()).add(group['name'])
+        self._source = groups
+        self.groups = {group['name']: group for group in groups}
+        self.groups_by_event = groups_by_event
+        self.generation += 1
+        return self
+
+    def event_names(self) -> Set[str]:
+        return set(self.groups_by_event)
+
+async def invalidate_groups():
+    cache = get_stats_cache()
+    if cache is not None:
+        await cache.invalidate(GROUPS_CACHE_NAMESPACE)
+
+def summarize_group(group: Dict[str, Any], members: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    counts: Dict[str, int] = {}
+    member_statuses = []
+    for event_name in group.get('events', []):
+        member = members.get(event_name)
+        status = member['eventStatus'] if member else NOT_STARTED
+        counts[status] = counts.get(status, 0) + 1
+        member_statuses.append({
+            'eventName': event_name,
+            'eventStatus': status,
+            'eventTime': member['eventTime'] if member else None,
+        })
+    if counts.get('FAILED'):
+        status = 'FAILED'
+    elif counts.get('STARTED'):
+        status = 'RUNNING'
+    elif member_statuses and counts.get('SUCCESS') == len(member_statuses):
+        status = 'SUCCESS'
+    elif not member_statuses or counts.get(NOT_STARTED) == len(member_statuses):
+        status = NOT_STARTED
+    else:
+        status = 'PARTIAL'
+    return {'name': group['name'], 'status': status, 'counts': counts, 'members': member_statuses}
+
+class DateStatusTable:
+    __slots__ = ('business_date', 'event_names', 'members', 'summaries', 'epoch', 'loaded_version',
+                 'local_bumps', 'index_generation')
+
+    def __init__(self, business_date: str, event_names: Set[str], members: Dict[str, Dict[str, Any]],
+                 version: Optional[str], index_generation: int):
+        self.business_date = business_date
+        self.event_names = event_names
+        self.members = members
+        self.summaries: Dict[str, Dict[str, Any]] = {}
+        self.epoch, _, loaded_version = (version or '.').partition('.')
+        self.loaded_version = int(loaded_version) if loaded_version else None
+        self.local_bumps = 0
+        self.index_generation = index_generation
+
+    def is_current(self, version: Optional[str]) -> bool:
+        # Only this worker's own writes have been applied in place; any
+        # other bump of the date's version means a foreign write or delete
+        if version is None or self.loaded_version is None:
+            return False
+        return version == f"{self.epoch}.{self.loaded_version + self.local_bumps}"
+
+class GroupStatusTracker:
+    """Latest status per grouped event name for recently requested business
+    dates. Loaded with one aggregation over all grouped event names, then
+    kept current by events this worker accepts, which also drop only the
+    summaries of the groups containing that event."""
+
+    def __init__(self, max_dates: int):
+        self.max_dates = max_dates
+        self.index = GroupIndex()
+        self._tables: 'OrderedDict[str, DateStatusTable]' = OrderedDict()
+
+        self.loads = 0
+        self.hits = 0
+
+    def record(self, events_data: List[Dict[str, Any]]):
+        """Apply accepted events; call right after their dates' versions were bumped."""
+        bumped = set()
+        for event_data in events_data:
+            table = self._tables.get(event_data.get('businessDate'))
+            if table is None or event_data.get('type', 'event') != 'event':
+                continue
+            if table.business_date not in bumped:
+                bumped.add(table.business_date)
+                table.local_bumps += 1
+            event_name = event_data['eventName']
+            if event_name not in table.event_names:
+                continue
+            try:
+                event_time = naive_utc(event_data.get('eventTime'))
+            except ValueError:
+                continue
+            current = table.members.get(event_name)
+            if event_time is None or (current is not None and current['eventTime'] > event_time):
+                continue
+            table.members[event_name] = {'eventStatus': event_data['eventStatus'], 'eventTime': event_time}
+            for group_name in self.index.groups_by_event.get(event_name, ()):
+                table.summaries.pop(group_name, None)
+
+    async def group_statuses(self, db, business_date: str, group_names: Iterable[str]) -> List[Optional[Dict[str, Any]]]:
+        """Summaries in the order of `group_names`; None for unknown groups."""
+        index = await self.index.refresh(db)
+        table = await self._table(db, business_date)
+        results = []
+        for group_name in group_names:
+            group = index.groups.get(group_name)
+            if group is None:
+                results.append(None)
+                continue
+            summary = table.summaries.get(group_name)
+            if summary is None:
+                summary = table.summaries[group_name] = summarize_group(group, table.members)
+            results.append({**summary, 'businessDate': business_date})
+        return results
+
+    async def _table(self, db, business_date: str) -> DateStatusTable:
+        version = await get_business_date_version(business_date)
+        table = self._tables.get(business_date)
+        if table is not None and table.is_current(version) and self.index.event_names() <= table.event_names:
+            if table.index_generation != self.index.generation:
+                table.summaries.clear()
+                table.index_generation = self.index.generation
+            self._tables.move_to_end(business_date)
+            self.hits += 1
+            return table
+
+        event_names = self.index.event_names()
+        members = await self.load_members(db, business_date, event_names)
+        table = DateStatusTable(business_date, event_names, members, version, self.index.generation)
+        self.loads += 1
+        self._tables[business_date] = table
+        self._tables.move_to_end(business_date)
+        while len(self._tables) > self.max_dates:
+            self._tables.popitem(last=False)
+        return table
+
+    @staticmethod
+    async def load_members(db, business_date: str, event_names: Set[str]) -> Dict[str, Dict[str, Any]]:
+        if not event_names:
+            return {}
+        partitioner = EventPartitioner(db)
+        rows = await db[partitioner.collection_name(business_date)].aggregate([
+            {'$match': {'businessDate': business_date, 'type': 'event', 'eventName': {'$in': sorted(event_names)}}},
+            {'$project': {'_id': 0, 'eventName': 1, 'eventStatus': 1, 'eventTime': 1}},
+            {'$sort': {'eventTime': -1}},
+            {'$group': {'_id': '$eventName', 'eventStatus': {'$first': '$eventStatus'}, 'eventTime': {'$first': '$eventTime'}}},
+        ]).to_list(None)
+        members = {}
+        for row in rows:
+            event_time = naive_utc(row['eventTime'])
+            if event_time is not None:
+                members[row['_id']] = {'eventStatus': row['eventStatus'], 'eventTime': event_time}
+        return members
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'business_dates': len(self._tables),
+            'groups': len(self.index.groups),
+            'indexed_event_names': len(self.index.groups_by_event),
+            'loads': self.loads,
+            'hits': self.hits,
+        }
+
+_tracker: Optional[GroupStatusTracker] = None
+
+def get_group_status_tracker() -> GroupStatusTracker:
+    global _tracker
+    if _tracker is None:
+        _tracker = GroupStatusTracker(settings.GROUP_STATUS_MAX_DATES)
+    return _tracker
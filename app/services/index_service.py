@@ -0,0 +1,105 @@
+from typing import List, Dict, Any
+from pymongo import IndexModel, ASCENDING
+from pymongo.errors import OperationFailure
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Declared indexes per collection. Startup reconciles these against the
+# database; anything present in Mongo but not listed here is reported as extra,
+# and an existing index whose uniqueness differs from its declaration as mismatched.
+INDEXES: Dict[str, List[IndexModel]] = {
+    'events': [
+        # Supersedes businessDate_type; older deployments report that one as extra and can drop it
+        IndexModel([('businessDate', ASCENDING), ('type', ASCENDING), ('_id', ASCENDING)], name='businessDate_type_id'),
+        IndexModel([('eventName', ASCENDING), ('eventStatus', ASCENDING), ('businessDate', ASCENDING)],
+                   name='eventName_eventStatus_businessDate'),
+        # One SLA outcome per expectation; every worker upserts them concurrently
+        IndexModel([('businessDate', ASCENDING), ('eventName', ASCENDING), ('eventStatus', ASCENDING)],
+                   name='outcome_businessDate_eventName_eventStatus', unique=True,
+                   partialFilterExpression={'type': 'outcome'}),
+    ],
+    'event_statistics': [
+        IndexModel([('event_name', ASCENDING), ('event_status', ASCENDING)], name='event_name_event_status', unique=True),
+    ],
+    'event_monthly_rollups': [
+        IndexModel([('eventName', ASCENDING), ('eventStatus', ASCENDING), ('month', ASCENDING)],
+                   name='eventName_eventStatus_month', unique=True),
+        IndexModel([('month', ASCENDING)], name='month'),
+    ],
+    'deletion_jobs': [
+        IndexModel([('status', ASCENDING), ('lease_expires_at', ASCENDING)], name='status_lease_expires_at'),
+    ],
+    'groups': [
+        IndexModel([('name', ASCENDING)], name='name', unique=True),
+    ],
+    'users': [
+        IndexModel([('email', ASCENDING)], name='email', unique=True),
+    ],
+    'jobs': [
+        IndexModel([('id', ASCENDING)], name='id', unique=True),
+    ],
+}
+
+class IndexService:
+    def __init__(self, db, indexes: Dict[str, List[IndexModel]] = None):
+        self.db = db
+        self.indexes = indexes if indexes is not None else INDEXES
+
+    async def reconcile(self) -> Dict[str, Dict[str, List[str]]]:
+        report = {}
+        indexes = dict(self.indexes)
+        if self.indexes is INDEXES:
+            from app.services.event_partitions import EventPartitioner
+
+            partitioner = EventPartitioner(self.db)
+            if partitioner.enabled:
+                for collection_name in await partitioner.list_partitions():
+                    indexes[collection_name] = INDEXES['events']
+        for collection_name, index_models in indexes.items():
+            report[collection_name] = await self._reconcile_collection(collection_name, index_models)
+        for collection_name, result in report.items():
+            if result['missing'] or result['extra'] or result['mismatched']:
+                logger.info(f"Indexes on {collection_name}: {result}")
+        return report
+
+    async def _reconcile_collection(self, collection_name: str, index_models: List[IndexModel]) -> Dict[str, List[str]]:
+        collection = self.db[collection_name]
+        existing = await collection.index_information()
+        existing_keys = {self._normalize_key(info['key']): name for name, info in existing.items()}
+
+        declared_keys = set()
+        missing, mismatched = [], []
+        for index_model in index_models:
+            document = index_model.document
+            key = self._normalize_key(document['key'].items())
+            declared_keys.add(key)
+            if key not in existing_keys:
+                missing.append(index_model)
+            elif document.get('unique', False) != existing[existing_keys[key]].get('unique', False):
+                # Same key, different options: Mongo will not rebuild it in place, so leave it to an operator
+                mismatched.append(existing_keys[key])
+
+        created, failed = [], []
+        for index_model in missing:
+            name = index_model.document['name']
+            try:
+                await collection.create_indexes([index_model])
+                created.append(name)
+            except OperationFailure as e:
+                logger.error(f"Failed to create index {name} on {collection_name}: {str(e)}")
+                failed.append(name)
+
+        extra = [name for key, name in existing_keys.items() if key not in declared_keys and name != '_id_']
+        return {
+            'missing': [index_model.document['name'] for index_model in missing],
+            'created': created,
+            'failed': failed,
+            'extra': extra,
+            'mismatched': mismatched,
+        }
+
+    @staticmethod
+    def _normalize_key(key) -> tuple:
+        return tuple((field, int(direction) if isinstance(direction, float) else direction) for field, direction in key)
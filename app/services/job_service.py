@@ -15,7 +15,8 @@ class JobService:
 
     async def create_job(self, job_data: Dict[str, Any]) -> Dict[str, Any]:
         result = await self.job_collection.insert_one(job_data)
-        return await self.job_collection.find_one({'_id': result.inserted_id})
+        job_data['_id'] = result.inserted_id
+        return job_data
 
     async def delete_job(self, job_id: str):
         await self.job_collection.delete_one({'id': job_id})
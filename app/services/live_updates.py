@@ -0,0 +1,197 @@
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Set, Tuple
+
+from pymongo.errors import OperationFailure
+
+from app.config import settings
+from app.services.event_partitions import EVENTS_COLLECTION, EventPartitioner
+from app.services.event_service import EVENT_PROJECTION
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+WATCHED_OPERATIONS = ['insert', 'update', 'replace']
+PAYLOAD_FIELDS = [field for field, included in EVENT_PROJECTION.items() if included] + ['type']
+
+class LiveSubscription:
+    """One dashboard connection: a bounded queue of messages for a
+    businessDate, optionally narrowed to a group's event names."""
+
+    def __init__(self, hub: 'LiveEventHub', business_date: str, event_names: Optional[Set[str]], queue_size: int):
+        self.hub = hub
+        self.business_date = business_date
+        self.event_names = event_names
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.closed = False
+        self.overflowed = False
+
+    def wants(self, event: Dict[str, Any]) -> bool:
+        return self.event_names is None or event.get('eventName') in self.event_names
+
+    async def next(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Next message, or None when nothing arrived within `timeout`.
+
+        After an overflow the already queued messages are still handed out,
+        then a final 'disconnect'; it has no id, so the client resumes from
+        the last message it actually received."""
+        if self.overflowed and self.queue.empty():
+            return {'id': None, 'type': 'disconnect', 'reason': 'slow consumer'}
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+class LiveEventHub:
+    """Runs this worker's single change stream on the events collection(s)
+    and fans inserts and updates out to subscribers by businessDate.
+
+    Recent changes are kept in a replay buffer keyed by resume token, so a
+    client reconnecting with its last message id catches up from memory.
+    A subscriber whose queue fills up is dropped and told to reconnect
+    rather than slowing everyone else down."""
+
+    def __init__(self, db, queue_size: int, replay_size: int):
+        self.db = db
+        self.partitioner = EventPartitioner(db)
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[LiveSubscription]] = {}
+        self._replay: Deque[Tuple[str, str, Dict[str, Any]]] = deque(maxlen=replay_size)
+        self._resume_token: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.delivered = 0
+        self.slow_consumer_disconnects = 0
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def subscribe(self, business_date: str, event_names: Optional[Set[str]] = None,
+                  resume_after: Optional[str] = None) -> LiveSubscription:
+        subscription = LiveSubscription(self, business_date, event_names, self.queue_size)
+        if resume_after:
+            self._replay_after(subscription, resume_after)
+        self._subscribers.setdefault(business_date, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: LiveSubscription):
+        subscription.closed = True
+        subscribers = self._subscribers.get(subscription.business_date)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.business_date]
+
+    def _replay_after(self, subscription: LiveSubscription, token: str):
+        tokens = [entry[0] for entry in self._replay]
+        if token not in tokens:
+            # Too old for the buffer (or from before this worker started)
+            self._offer(subscription, {'id': None, 'type': 'reset'})
+            return
+        for entry_token, business_date, message in list(self._replay)[tokens.index(token) + 1:]:
+            if business_date == subscription.business_date and subscription.wants(message['event']):
+                if not self._offer(subscription, message):
+                    return
+
+    def _offer(self, subscription: LiveSubscription, message: Dict[str, Any]) -> bool:
+        try:
+            subscription.queue.put_nowait(message)
+            self.delivered += 1
+            return True
+        except asyncio.QueueFull:
+            self.slow_consumer_disconnects += 1
+            subscription.overflowed = True
+            self.unsubscribe(subscription)
+            return False
+
+    def _dispatch(self, change: Dict[str, Any]):
+        document = change.get('fullDocument')
+        if not document or 'businessDate' not in document or document.get('type') != 'event':
+            # Expectations and SLA outcomes share the collection but are not dashboard events
+            return
+        token = change['_id']['_data']
+        business_date = document['businessDate']
+        message = {
+            'id': token,
+            'type': change['operationType'],
+            'event': {field: document[field] for field in PAYLOAD_FIELDS if field in document},
+        }
+        self._replay.append((token, business_date, message))
+        for subscription in list(self._subscribers.get(business_date, ())):
+            if subscription.wants(message['event']):
+                self._offer(subscription, message)
+
+    def _reset_all(self):
+        for subscribers in list(self._subscribers.values()):
+            for subscription in list(subscribers):
+                self._offer(subscription, {'id': None, 'type': 'reset'})
+        self._replay.clear()
+
+    def _watch(self):
+        pipeline = [{'$match': {'operationType': {'$in': WATCHED_OPERATIONS}, 'fullDocument.type': 'event'}}]
+        options = {'full_document': 'updateLookup', 'resume_after': self._resume_token}
+        if self.partitioner.enabled:
+            # One stream for 'events' and every events_* partition, including future ones
+            pipeline.insert(0, {'$match': {'ns.coll': {'$regex': f'^{EVENTS_COLLECTION}(_\\d|$)'}}})
+            return self.db.watch(pipeline, **options)
+        return self.db[EVENTS_COLLECTION].watch(pipeline, **options)
+
+    async def _run(self):
+        backoff = 1
+        while True:
+            try:
+                async with self._watch() as stream:
+                    backoff = 1
+                    async for change in stream:
+                        self._resume_token = change['_id']
+                        self._dispatch(change)
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                logger.warning(f"Live updates change stream failed, restarting without resume token: {str(e)}")
+                self._resume_token = None
+                self._reset_all()
+            except Exception as e:
+                logger.warning(f"Live updates change stream error: {str(e)}")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'subscribers': sum(len(subscribers) for subscribers in self._subscribers.values()),
+            'business_dates': len(self._subscribers),
+            'replay_buffered': len(self._replay),
+            'delivered': self.delivered,
+            'slow_consumer_disconnects': self.slow_consumer_disconnects,
+        }
+
+_live_event_hub: Optional[LiveEventHub] = None
+
+def get_live_event_hub() -> Optional[LiveEventHub]:
+    return _live_event_hub
+
+async def start_live_event_hub(db):
+    global _live_event_hub
+    if not settings.LIVE_UPDATES_ENABLED or _live_event_hub is not None:
+        return
+    _live_event_hub = LiveEventHub(db, settings.LIVE_UPDATES_QUEUE_SIZE, settings.LIVE_UPDATES_REPLAY_SIZE)
+    _live_event_hub.start()
+
+async def stop_live_event_hub():
+    global _live_event_hub
+    if _live_event_hub is None:
+        return
+    await _live_event_hub.stop()
+    _live_event_hub = None
@@ -1,6 +1,7 @@
-import bcrypt
 from typing import Dict, Any
 
+from app.utils.password_hasher import get_password_hasher
+
 class LoginService:
     def __init__(self, db):
         self.db = db
@@ -9,7 +10,7 @@ class LoginService:
     async def authenticate_user(self, email: str, password: str) -> Dict[str, Any]:
         user = await self.user_collection.find_one({'email': email})
         
-        if user and bcrypt.checkpw(password.encode('utf-8'), user['password'].encode('utf-8')):
+        if user and await get_password_hasher().verify(password, user['password']):
             return {'isAuthenticated': True, 'user': user}
         else:
             return {'isAuthenticated': False, 'error': 'Invalid credentials'}
\ No newline at end of file
@@ -0,0 +1,226 @@
+import asyncio
+import json
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from typing import List, Dict, Any, Optional, Tuple
+
+from app.config import settings
+from app.utils.batching import MicroBatcher
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+def queue_arguments(queue_name: str) -> Dict[str, Any]:
+    # Publisher and consumer must declare the queue with identical arguments
+    return {
+        'x-dead-letter-exchange': '',
+        'x-dead-letter-routing-key': dead_letter_queue_name(queue_name),
+    }
+
+def dead_letter_queue_name(queue_name: str) -> str:
+    return f"{queue_name}.dead"
+
+def encode_event(event_data: Dict[str, Any]) -> bytes:
+    def default(value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        return str(value)
+    return json.dumps(event_data, default=default).encode('utf-8')
+
+def decode_event(body: bytes) -> Dict[str, Any]:
+    return json.loads(body)
+
+class EventPublisherUnavailable(Exception):
+    pass
+
+class EventPublisherFull(EventPublisherUnavailable):
+    pass
+
+class EventBroker(ABC):
+    """Transport used by EventPublisher. publish_batch must only return once
+    the broker has confirmed every message in the batch."""
+
+    @abstractmethod
+    async def connect(self):
+        pass
+
+    @abstractmethod
+    async def publish_batch(self, bodies: List[bytes]):
+        pass
+
+    @abstractmethod
+    async def close(self):
+        pass
+
+class InMemoryBroker(EventBroker):
+    def __init__(self):
+        self.published: List[bytes] = []
+        self.connected = False
+
+    async def connect(self):
+        self.connected = True
+
+    async def publish_batch(self, bodies: List[bytes]):
+        self.published.extend(bodies)
+
+    async def close(self):
+        self.connected = False
+
+class AioPikaBroker(EventBroker):
+    def __init__(self, url: str, queue_name: str, channel_pool_size: int):
+        self.url = url
+        self.queue_name = queue_name
+        self.channel_pool_size = channel_pool_size
+        self._connection = None
+        self._channel_pool = None
+
+    async def connect(self):
+        import aio_pika
+        from aio_pika.pool import Pool
+
+        self._connection = await aio_pika.connect_robust(self.url)
+
+        async def get_channel():
+            return await self._connection.channel(publisher_confirms=True)
+
+        self._channel_pool = Pool(get_channel, max_size=self.channel_pool_size)
+        async with self._channel_pool.acquire() as channel:
+            await channel.declare_queue(dead_letter_queue_name(self.queue_name), durable=True)
+            await channel.declare_queue(self.queue_name, durable=True, arguments=queue_arguments(self.queue_name))
+
+    async def publish_batch(self, bodies: List[bytes]):
+        import aio_pika
+
+        async with self._channel_pool.acquire() as channel:
+            exchange = channel.default_exchange
+            # Publish the whole batch before waiting so confirms are collected together
+            await asyncio.gather(*[
+                exchange.publish(
+                    aio_pika.Message(body, delivery_mode=aio_pika.DeliveryMode.PERSISTENT, content_type='application/json'),
+                    routing_key=self.queue_name
+                )
+                for body in bodies
+            ])
+
+    async def close(self):
+        if self._channel_pool is not None:
+            await self._channel_pool.close()
+        if self._connection is not None:
+            await self._connection.close()
+        self._channel_pool = None
+        self._connection = None
+
+class EventPublisher:
+    """Per-worker publisher that batches events onto a long-lived broker
+    connection and answers each caller once its batch is confirmed."""
+
+    def __init__(self, broker: EventBroker, max_batch_size: int, max_latency_ms: int, max_pending: int,
+                 max_retries: int, max_backoff_seconds: float):
+        self.broker = broker
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self.max_backoff = max_backoff_seconds
+        self._batcher = MicroBatcher(self._publish_with_retry, max_batch_size, max_latency_ms)
+        self._connected = False
+
+        self.published = 0
+        self.failed = 0
+        self.rejected = 0
+        self.batches = 0
+        self.reconnects = 0
+
+    def start(self):
+        self._batcher.start()
+
+    async def stop(self):
+        await self._batcher.stop()
+        if self._connected:
+            await self.broker.close()
+            self._connected = False
+
+    async def publish(self, event_data: Dict[str, Any]):
+        # Bounded so a broker outage (batches stuck in retry) cannot grow memory without limit
+        if self._batcher.closing or len(self._batcher) >= self.max_pending:
+            self.rejected += 1
+            raise EventPublisherFull()
+        future = asyncio.get_running_loop().create_future()
+        self._batcher.add((encode_event(event_data), future))
+        await future
+
+    async def _publish_with_retry(self, batch: List[Tuple[bytes, asyncio.Future]]):
+        backoff = 0.1
+        for attempt in range(self.max_retries + 1):
+            try:
+                if not self._connected:
+                    await self.broker.connect()
+                    self._connected = True
+                await self.broker.publish_batch([body for body, _ in batch])
+                break
+            except Exception as e:
+                logger.warning(f"RabbitMQ publish attempt {attempt + 1} failed: {str(e)}")
+                if self._connected:
+                    try:
+                        await self.broker.close()
+                    except Exception:
+                        pass
+                    self._connected = False
+                    self.reconnects += 1
+                if attempt == self.max_retries:
+                    self.failed += len(batch)
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    return
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+
+        self.batches += 1
+        self.published += len(batch)
+        for _, future in batch:
+            if not future.done():
+                future.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'queue_depth': len(self._batcher),
+            'max_pending': self.max_pending,
+            'connected': self._connected,
+            'published': self.published,
+            'failed': self.failed,
+            'rejected': self.rejected,
+            'batches': self.batches,
+            'reconnects': self.reconnects,
+        }
+
+_event_publisher: Optional[EventPublisher] = None
+
+def get_event_publisher() -> Optional[EventPublisher]:
+    return _event_publisher
+
+async def start_event_publisher(broker: Optional[EventBroker] = None):
+    global _event_publisher
+    if _event_publisher is not None:
+        return
+    if broker is None:
+        if not settings.RABBITMQ_URL:
+            return
+        broker = AioPikaBroker(settings.RABBITMQ_URL, settings.RABBITMQ_QUEUE, settings.RABBITMQ_CHANNEL_POOL_SIZE)
+    _event_publisher = EventPublisher(
+        broker,
+        max_batch_size=settings.RABBITMQ_PUBLISH_BATCH_SIZE,
+        max_latency_ms=settings.RABBITMQ_PUBLISH_MAX_LATENCY_MS,
+        max_pending=settings.RABBITMQ_PUBLISH_MAX_PENDING,
+        max_retries=settings.RABBITMQ_PUBLISH_MAX_RETRIES,
+        max_backoff_seconds=settings.RABBITMQ_RECONNECT_MAX_BACKOFF_SECONDS,
+    )
+    _event_publisher.start()
+    logger.info("RabbitMQ event publisher started")
+
+async def stop_event_publisher():
+    global _event_publisher
+    if _event_publisher is None:
+        return
+    await _event_publisher.stop()
+    _event_publisher = None
+    logger.info("RabbitMQ event publisher stopped")
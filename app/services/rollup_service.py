@@ -0,0 +1,170 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import List, Dict, Any
+
+from pymongo import UpdateOne
+
+from app.services.event_partitions import EventPartitioner
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+class MonthlyRollupService:
+    """One document per (eventName, eventStatus, month) with the compact
+    per-day event times, so a month of drill-down is a point lookup."""
+
+    def __init__(self, db):
+        self.db = db
+        self.rollup_collection = self.db['event_monthly_rollups']
+        self.partitioner = EventPartitioner(db)
+
+    @staticmethod
+    def month_of(business_date: str) -> str:
+        return business_date[:7]
+
+    async def record(self, events_data: List[Dict[str, Any]]):
+        requests = []
+        for event_data in events_data:
+            if event_data.get('type') != 'event':
+                continue
+            requests.append(UpdateOne(
+                {
+                    'eventName': event_data['eventName'],
+                    'eventStatus': event_data['eventStatus'],
+                    'month': self.month_of(event_data['businessDate']),
+                },
+                {'$push': {f"days.{event_data['businessDate']}": {
+                    'eventId': event_data['eventId'],
+                    'eventTime': event_data['eventTime'],
+                }}},
+                upsert=True
+            ))
+        if requests:
+            await self.rollup_collection.bulk_write(requests, ordered=False)
+
+    async def record_outcomes(self, outcomes: List[Dict[str, Any]]):
+        from app.services.sla_evaluator import merge_outcome_expr
+
+        requests = []
+        for outcome in outcomes:
+            business_date = outcome['businessDate']
+            requests.append(UpdateOne(
+                {
+                    'eventName': outcome['eventName'],
+                    'eventStatus': outcome['eventStatus'],
+                    'month': self.month_of(business_date),
+                },
+                [{'$set': {'outcomes': {'$mergeObjects': [
+                    {'$ifNull': ['$outcomes', {}]},
+                    {'$arrayToObject': [[{
+                        'k': {'$literal': business_date},
+                        'v': merge_outcome_expr(f'$outcomes.{business_date}', outcome['outcomeStatus']),
+                    }]]},
+                ]}}}],
+                upsert=True
+            ))
+        if requests:
+            await self.rollup_collection.bulk_write(requests, ordered=False)
+
+    async def remove_business_dates(self, business_dates: List[str]):
+        dates_by_month = defaultdict(list)
+        for business_date in business_dates:
+            dates_by_month[self.month_of(business_date)].append(business_date)
+        for month, dates in dates_by_month.items():
+            unset = {}
+            for business_date in dates:
+                unset[f'days.{business_date}'] = ''
+                unset[f'outcomes.{business_date}'] = ''
+            await self.rollup_collection.update_many({'month': month}, {'$unset': unset})
+
+    async def remove_business_dates_before(self, business_date: str):
+        """Forget every business date before business_date, for retention
+        drops that don't list the dates they removed."""
+        month = self.month_of(business_date)
+        await self.rollup_collection.delete_many({'month': {'$lt': month}})
+        rollups = await self.rollup_collection.find({'month': month}, {'days': 1, 'outcomes': 1}).to_list(None)
+        dates = {
+            day
+            for rollup in rollups
+            for field in ('days', 'outcomes')
+            for day in rollup.get(field, {})
+            if day < business_date
+        }
+        if dates:
+            await self.remove_business_dates(sorted(dates))
+
+    async def get_recent(self, event_name: str, event_status: str, days: int = 30) -> List[Dict[str, Any]]:
+        today = datetime.now()
+        start_date = (today - timedelta(days=days)).strftime('%Y-%m-%d')
+        months = self.months_between(start_date, today.strftime('%Y-%m-%d'))
+        rollups = await self.rollup_collection.find({
+            'eventName': event_name,
+            'eventStatus': event_status,
+            'month': {'$in': months}
+        }).to_list(None)
+
+        events = []
+        for rollup in rollups:
+            outcomes = rollup.get('outcomes', {})
+            for business_date, entries in rollup.get('days', {}).items():
+                if business_date < start_date:
+                    continue
+                for entry in entries:
+                    events.append({
+                        'businessDate': business_date,
+                        'eventName': event_name,
+                        'eventStatus': event_status,
+                        'eventId': entry['eventId'],
+                        'eventTime': entry['eventTime'],
+                        'outcomeStatus': outcomes.get(business_date),
+                    })
+        events.sort(key=lambda event: (event['businessDate'], event['eventTime']))
+        return events
+
+    @classmethod
+    def months_between(cls, start_date: str, end_date: str) -> List[str]:
+        year, month = map(int, cls.month_of(start_date).split('-'))
+        end_month = cls.month_of(end_date)
+        months = []
+        while True:
+            months.append(f'{year:04d}-{month:02d}')
+            if months[-1] >= end_month:
+                return months
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+    async def rebuild_month(self, month: str):
+        await self.rollup_collection.delete_many({'month': month})
+        month_start = datetime.strptime(f'{month}-01', '%Y-%m-%d')
+        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        await self.partitioner.aggregate_across(
+            self.partitioner.collection_names_for_range(month_start.strftime('%Y-%m-%d'), month_end.strftime('%Y-%m-%d')),
+            {'type': 'event', 'businessDate': {'$regex': f'^{month}-'}},
+            [
+                {'$sort': {'eventTime': 1}},
+                {'$group': {
+                    '_id': {'eventName': '$eventName', 'eventStatus': '$eventStatus', 'businessDate': '$businessDate'},
+                    'entries': {'$push': {'eventId': '$eventId', 'eventTime': '$eventTime'}},
+                }},
+                {'$group': {
+                    '_id': {'eventName': '$_id.eventName', 'eventStatus': '$_id.eventStatus'},
+                    'days': {'$push': {'k': '$_id.businessDate', 'v': '$entries'}},
+                }},
+                {'$project': {
+                    '_id': 0,
+                    'eventName': '$_id.eventName',
+                    'eventStatus': '$_id.eventStatus',
+                    'month': month,
+                    'days': {'$arrayToObject': '$days'},
+                }},
+                {'$merge': {'into': 'event_monthly_rollups', 'on': ['eventName', 'eventStatus', 'month']}},
+            ]
+        ).to_list(None)
+        # Outcomes live only in the rollups and the outcome documents; restore them from the latter
+        outcomes = await self.partitioner.aggregate_across(
+            self.partitioner.collection_names_for_range(month_start.strftime('%Y-%m-%d'), month_end.strftime('%Y-%m-%d')),
+            {'type': 'outcome', 'businessDate': {'$regex': f'^{month}-'}},
+            [{'$project': {'_id': 0, 'businessDate': 1, 'eventName': 1, 'eventStatus': 1, 'outcomeStatus': 1}}]
+        ).to_list(None)
+        await self.record_outcomes(outcomes)
+        logger.info(f"Rebuilt monthly rollups for {month}")
@@ -0,0 +1,199 @@
+import asyncio
+import math
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Tuple
+
+from pymongo import UpdateOne
+
+from app.config import settings
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+DATE_FORMAT = '%Y-%m-%d'
+
+def event_offset_seconds(event_data: Dict[str, Any]) -> Optional[float]:
+    event_time = event_data.get('eventTime')
+    if isinstance(event_time, str):
+        event_time = datetime.fromisoformat(event_time)
+    if not isinstance(event_time, datetime):
+        return None
+    if event_time.tzinfo is not None:
+        # Mongo stores naive UTC, so compare on the same basis as the history rebuild
+        event_time = event_time.astimezone(timezone.utc).replace(tzinfo=None)
+    midnight = datetime.strptime(event_data['businessDate'], DATE_FORMAT)
+    return (event_time - midnight).total_seconds()
+
+def summarize(running: Dict[str, Any], bucket_seconds: int) -> Dict[str, Any]:
+    """Derive mean/stddev and histogram quantiles from the stored running aggregates."""
+    count = running.get('count', 0)
+    if not count:
+        return {'count': 0}
+    # sum and sum_squares are taken around `shift` (absent, i.e. 0, on older documents)
+    shifted_mean = running['sum'] / count
+    mean = running.get('shift', 0) + shifted_mean
+    variance = max(running['sum_squares'] / count - shifted_mean * shifted_mean, 0.0)
+
+    buckets = sorted((int(bucket), bucket_count) for bucket, bucket_count in running.get('histogram', {}).items())
+
+    def quantile(q: float) -> Optional[float]:
+        target = q * count
+        cumulative = 0
+        for bucket, bucket_count in buckets:
+            cumulative += bucket_count
+            if cumulative >= target:
+                return (bucket + 0.5) * bucket_seconds
+        return None
+
+    return {
+        'count': count,
+        'mean_seconds': mean,
+        'stddev_seconds': math.sqrt(variance),
+        'median_seconds': quantile(0.5),
+        'p90_seconds': quantile(0.9),
+    }
+
+def reshift(delta: Dict[str, Any], shift: float) -> Tuple[float, float]:
+    """delta's sum and sum of squares re-expressed around `shift`."""
+    d = delta['shift'] - shift
+    return (delta['sum'] + delta['count'] * d,
+            delta['sum_squares'] + 2 * d * delta['sum'] + delta['count'] * d * d)
+
+class RunningStatisticsRecorder:
+    """Accumulates per-(eventName, eventStatus) count, sum, sum of squares and
+    a fixed-width time-of-day histogram for accepted events, and folds them
+    into event_statistics on a fixed interval.
+
+    Sums are kept around a per-key shift (the first value seen) rather than
+    zero, so sum_squares / count - mean^2 does not cancel catastrophically.
+    The stored document keeps the shift of its first writer; each flush
+    converts its delta to that shift on the server."""
+
+    def __init__(self, db, flush_interval_ms: int, bucket_seconds: int):
+        self.stats_collection = db['event_statistics']
+        self.flush_interval = flush_interval_ms / 1000
+        self.bucket_seconds = bucket_seconds
+        self._pending: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._closing = asyncio.Event()
+
+    def record(self, events_data: List[Dict[str, Any]]):
+        for event_data in events_data:
+            try:
+                offset = event_offset_seconds(event_data)
+            except (KeyError, ValueError):
+                offset = None
+            if offset is None:
+                continue
+            key = (event_data['eventName'], event_data['eventStatus'])
+            delta = self._pending.get(key)
+            if delta is None:
+                delta = self._pending[key] = {
+                    'shift': offset, 'count': 0, 'sum': 0.0, 'sum_squares': 0.0, 'histogram': defaultdict(int),
+                }
+            delta['count'] += 1
+            delta['sum'] += offset - delta['shift']
+            delta['sum_squares'] += (offset - delta['shift']) ** 2
+            delta['histogram'][str(math.floor(offset / self.bucket_seconds))] += 1
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._closing.set()
+        if self._task:
+            await self._task
+        await self.flush()
+
+    async def _run(self):
+        while not self._closing.is_set():
+            try:
+                await asyncio.wait_for(self._closing.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing running statistics: {str(e)}", exc_info=True)
+
+    async def flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        updated_at = datetime.now().isoformat()
+        requests = []
+        for (event_name, event_status), delta in pending.items():
+            requests.append(UpdateOne(
+                {'event_name': event_name, 'event_status': event_status},
+                self.running_update(delta, updated_at),
+                upsert=True
+            ))
+        try:
+            await self.stats_collection.bulk_write(requests, ordered=False)
+        except Exception:
+            # Put the deltas back so the next flush retries them
+            for key, delta in pending.items():
+                self._merge_back(key, delta)
+            raise
+
+    @staticmethod
+    def running_update(delta: Dict[str, Any], updated_at: str) -> List[Dict[str, Any]]:
+        def stored(field: str, default: Any = 0) -> Dict[str, Any]:
+            return {'$ifNull': [f'$running.{field}', default]}
+
+        # Documents with running totals but no shift predate shifting and are around 0
+        shift = {'$ifNull': ['$running.shift', {'$cond': [{'$gt': [stored('count'), 0]}, 0, delta['shift']]}]}
+        d = {'$subtract': [delta['shift'], '$running.shift']}
+        fields = {
+            'running.count': {'$add': [stored('count'), delta['count']]},
+            'running.sum': {'$add': [stored('sum'), delta['sum'], {'$multiply': [delta['count'], d]}]},
+            'running.sum_squares': {'$add': [
+                stored('sum_squares'),
+                delta['sum_squares'],
+                {'$multiply': [2, d, delta['sum']]},
+                {'$multiply': [delta['count'], d, d]},
+            ]},
+            'running_updated_at': {'$literal': updated_at},
+        }
+        for bucket, bucket_count in delta['histogram'].items():
+            fields[f'running.histogram.{bucket}'] = {'$add': [stored(f'histogram.{bucket}'), bucket_count]}
+        return [{'$set': {'running.shift': shift}}, {'$set': fields}]
+
+    def _merge_back(self, key: Tuple[str, str], delta: Dict[str, Any]):
+        current = self._pending.get(key)
+        if current is None:
+            self._pending[key] = delta
+            return
+        delta_sum, delta_sum_squares = reshift(delta, current['shift'])
+        current['count'] += delta['count']
+        current['sum'] += delta_sum
+        current['sum_squares'] += delta_sum_squares
+        for bucket, bucket_count in delta['histogram'].items():
+            current['histogram'][bucket] += bucket_count
+
+_recorder: Optional[RunningStatisticsRecorder] = None
+
+def get_running_statistics_recorder() -> Optional[RunningStatisticsRecorder]:
+    return _recorder
+
+async def start_running_statistics(db):
+    global _recorder
+    if not settings.RUNNING_STATS_ENABLED or _recorder is not None:
+        return
+    _recorder = RunningStatisticsRecorder(
+        db,
+        flush_interval_ms=settings.RUNNING_STATS_FLUSH_INTERVAL_MS,
+        bucket_seconds=settings.RUNNING_STATS_BUCKET_SECONDS,
+    )
+    _recorder.start()
+    logger.info("Running statistics recorder started")
+
+async def stop_running_statistics():
+    global _recorder
+    if _recorder is None:
+        return
+    await _recorder.stop()
+    _recorder = None
+    logger.info("Running statistics recorder stopped")
@@ -0,0 +1,408 @@
+import asyncio
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Iterable, Optional, Set, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.config import settings
+from app.services.event_partitions import EventPartitioner
+from app.services.rollup_service import MonthlyRollupService
+from app.utils.response_cache import bump_business_date_versions
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+DATE_FORMAT = '%Y-%m-%d'
+
+ON_TIME = 'ON_TIME'
+LATE = 'LATE'
+MISSING = 'MISSING'
+
+OUTCOME_PRECEDENCE = {MISSING: 0, LATE: 1, ON_TIME: 2}
+
+def sla_scope(business_date: str) -> str:
+    """Response-cache version scope for a date's SLA outcomes."""
+    return f'_sla:{business_date}'
+
+def merge_outcome_expr(current: Any, status: str) -> Dict[str, Any]:
+    # Every worker evaluates independently, so writes merge by precedence
+    # (ON_TIME > LATE > MISSING) instead of overwriting each other
+    if status == ON_TIME:
+        return {'$literal': ON_TIME}
+    if status == LATE:
+        return {'$cond': [{'$eq': [current, ON_TIME]}, ON_TIME, LATE]}
+    return {'$ifNull': [current, MISSING]}
+
+def naive_utc(value: Any) -> Optional[datetime]:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def _epoch(value: datetime) -> float:
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+class TimerWheel:
+    """Hashed timing wheel: O(1) scheduling, and advancing costs one slot
+    per elapsed tick no matter how many timers are pending. Entries more
+    than one revolution out stay in their slot until their tick comes."""
+
+    def __init__(self, tick_seconds: float, slots: int, now: float):
+        self.tick_seconds = tick_seconds
+        self.slots: List[List[Tuple[int, Any]]] = [[] for _ in range(slots)]
+        self.current_tick = int(now // tick_seconds)
+
+    def schedule(self, when: float, item: Any):
+        target_tick = max(int(when // self.tick_seconds), self.current_tick + 1)
+        self.slots[target_tick % len(self.slots)].append((target_tick, item))
+
+    def advance(self, now: float) -> List[Any]:
+        new_tick = int(now // self.tick_seconds)
+        if new_tick <= self.current_tick:
+            return []
+        expired = []
+        ticks = range(self.current_tick + 1, new_tick + 1)
+        if len(ticks) > len(self.slots):
+            ticks = range(new_tick - len(self.slots) + 1, new_tick + 1)
+        for tick in ticks:
+            slot = self.slots[tick % len(self.slots)]
+            if not slot:
+                continue
+            remaining = []
+            for entry in slot:
+                if entry[0] <= new_tick:
+                    expired.append(entry[1])
+                else:
+                    remaining.append(entry)
+            self.slots[tick % len(self.slots)] = remaining
+        self.current_tick = new_tick
+        return expired
+
+class DateSlaState:
+    __slots__ = ('business_date', 'expectations', 'resolved', 'scheduled', 'seeded', 'loaded_at', 'used_at')
+
+    def __init__(self, business_date: str):
+        self.business_date = business_date
+        # (eventName, eventStatus) -> (deadline, expectation eventId)
+        self.expectations: Dict[Tuple[str, str], Tuple[datetime, str]] = {}
+        self.resolved: Dict[Tuple[str, str], str] = {}
+        self.scheduled: Dict[Tuple[str, str], float] = {}
+        # Expectations whose stored arrivals have been read; later arrivals come through record()
+        self.seeded: Set[Tuple[str, str]] = set()
+        self.loaded_at = 0.0
+        self.used_at = 0.0
+
+class SlaEvaluator:
+    """Tracks, per business date, which expected (eventName, eventStatus)
+    pairs have arrived and writes ON_TIME / LATE / MISSING outcome
+    documents in batches.
+
+    Accepted events are only queued by record(); the flush loop matches
+    them against the date's expectations in O(1) each and advances a timer
+    wheel that fires MISSING once a deadline (expectedLatestTime plus
+    SLA_GRACE_SECONDS) passes without an arrival."""
+
+    def __init__(self, db, flush_interval_ms: int, grace_seconds: int, tick_seconds: int, slots: int,
+                 refresh_seconds: int, idle_seconds: int):
+        self.db = db
+        self.partitioner = EventPartitioner(db)
+        self.flush_interval = flush_interval_ms / 1000
+        self.grace = timedelta(seconds=grace_seconds)
+        self.refresh_seconds = refresh_seconds
+        self.idle_seconds = idle_seconds
+        self.wheel = TimerWheel(tick_seconds, slots, time.time())
+        self._states: Dict[str, DateSlaState] = {}
+        self._arrivals: List[Dict[str, Any]] = []
+        self._outcomes: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._closing = asyncio.Event()
+
+        self.written = 0
+        self.counts = defaultdict(int)
+
+    def record(self, events_data: List[Dict[str, Any]]):
+        for event_data in events_data:
+            if event_data.get('type', 'event') == 'event':
+                self._arrivals.append(event_data)
+
+    def forget(self, business_dates: Iterable[str]):
+        """Drop cached state so the next flush reloads the expectations."""
+        for business_date in business_dates:
+            self._states.pop(business_date, None)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._closing.set()
+        if self._task:
+            await self._task
+        await self.flush()
+
+    async def _run(self):
+        while not self._closing.is_set():
+            try:
+                await asyncio.wait_for(self._closing.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error evaluating SLA outcomes: {str(e)}", exc_info=True)
+
+    async def flush(self):
+        today = datetime.now(timezone.utc).strftime(DATE_FORMAT)
+        arrivals, self._arrivals = self._arrivals, []
+        for business_date in {today} | {event['businessDate'] for event in arrivals}:
+            await self._ensure_loaded(business_date)
+
+        for event_data in arrivals:
+            self._evaluate_arrival(event_data)
+        for business_date, key in self.wheel.advance(time.time()):
+            self._expire(business_date, key)
+
+        self._evict_idle(today)
+        await self._write_outcomes()
+
+    async def _ensure_loaded(self, business_date: str):
+        state = self._states.get(business_date)
+        now = time.time()
+        if state is not None:
+            state.used_at = now
+            if now - state.loaded_at < self.refresh_seconds:
+                return
+        else:
+            state = self._states[business_date] = DateSlaState(business_date)
+            state.used_at = now
+        collection = self.db[self.partitioner.collection_name(business_date)]
+        expectations = await collection.find(
+            {'businessDate': business_date, 'type': 'expectation'},
+            {'_id': 0, 'eventName': 1, 'eventStatus': 1, 'eventTime': 1, 'expectedLatestTime': 1, 'eventId': 1}
+        ).to_list(None)
+        state.expectations = {}
+        state.loaded_at = now
+        for expectation in expectations:
+            deadline = naive_utc(expectation.get('expectedLatestTime') or expectation.get('eventTime'))
+            if deadline is not None:
+                state.expectations[(expectation['eventName'], expectation['eventStatus'])] = (deadline, expectation.get('eventId'))
+        await self._seed_resolved(collection, state)
+
+        for key, (deadline, _) in state.expectations.items():
+            if key in state.resolved:
+                continue
+            fires_at = _epoch(deadline + self.grace)
+            if fires_at <= now:
+                self._expire(business_date, key)
+            elif state.scheduled.get(key) != fires_at:
+                state.scheduled[key] = fires_at
+                self.wheel.schedule(fires_at, (business_date, key))
+
+    async def _seed_resolved(self, collection, state: DateSlaState):
+        """Take outcomes already written (by any worker or an earlier process)
+        and arrivals already stored as resolved, so a restart, a lost
+        in-memory queue or events older than the evaluator never turn into
+        false MISSING outcomes. Stored arrivals are read once per expectation;
+        a refresh only re-reads outcomes, which other workers keep writing."""
+        if not state.expectations:
+            return
+        outcomes = await collection.find(
+            {'businessDate': state.business_date, 'type': 'outcome'},
+            {'_id': 0, 'eventName': 1, 'eventStatus': 1, 'outcomeStatus': 1}
+        ).to_list(None)
+        for outcome in outcomes:
+            key = (outcome['eventName'], outcome['eventStatus'])
+            current = state.resolved.get(key)
+            if outcome.get('outcomeStatus') in OUTCOME_PRECEDENCE and (
+                current is None or OUTCOME_PRECEDENCE[outcome['outcomeStatus']] > OUTCOME_PRECEDENCE[current]
+            ):
+                state.resolved[key] = outcome['outcomeStatus']
+
+        pending = [key for key in state.expectations if key not in state.seeded and state.resolved.get(key) != ON_TIME]
+        if not pending:
+            state.seeded.update(state.expectations)
+            return
+        arrivals = await collection.aggregate([
+            {'$match': {
+                'businessDate': state.business_date,
+                'type': 'event',
+                'eventName': {'$in': sorted({event_name for event_name, _ in pending})},
+            }},
+            {'$sort': {'eventTime': 1}},
+            {'$group': {
+                '_id': {'eventName': '$eventName', 'eventStatus': '$eventStatus'},
+                'eventTime': {'$first': '$eventTime'},
+                'eventId': {'$first': '$eventId'},
+            }},
+        ]).to_list(None)
+        pending = set(pending)
+        for arrival in arrivals:
+            if (arrival['_id']['eventName'], arrival['_id']['eventStatus']) not in pending:
+                continue
+            self._evaluate_arrival({'businessDate': state.business_date, **arrival['_id'],
+                                    'eventTime': arrival['eventTime'], 'eventId': arrival['eventId']})
+        state.seeded.update(state.expectations)
+
+    def _evaluate_arrival(self, event_data: Dict[str, Any]):
+        state = self._states.get(event_data['businessDate'])
+        key = (event_data['eventName'], event_data['eventStatus'])
+        if state is None or key not in state.expectations:
+            return
+        try:
+            arrival = naive_utc(event_data.get('eventTime'))
+        except ValueError:
+            arrival = None
+        if arrival is None:
+            return
+        deadline, _ = state.expectations[key]
+        status = ON_TIME if arrival <= deadline else LATE
+        if state.resolved.get(key) in (ON_TIME, status):
+            return
+        state.resolved[key] = status
+        self._queue_outcome(state, key, status, arrival, event_data.get('eventId'))
+
+    def _expire(self, business_date: str, key: Tuple[str, str]):
+        state = self._states.get(business_date)
+        # Timers are never cancelled; an arrival or eviction just makes them no-ops
+        if state is None or key in state.resolved or key not in state.expectations:
+            return
+        deadline, _ = state.expectations[key]
+        if _epoch(deadline + self.grace) > time.time():
+            # Expectations were regenerated with a later deadline
+            return
+        state.resolved[key] = MISSING
+        self._queue_outcome(state, key, MISSING, None, None)
+
+    def _queue_outcome(self, state: DateSlaState, key: Tuple[str, str], status: str,
+                       arrival: Optional[datetime], event_id: Optional[str]):
+        deadline, expectation_id = state.expectations[key]
+        self.counts[status] += 1
+        self._merge_outcome((state.business_date, *key), {
+            'status': status,
+            'deadline': deadline,
+            'expectationId': expectation_id,
+            'arrivalTime': arrival,
+            'arrivalEventId': event_id,
+        })
+
+    def _merge_outcome(self, outcome_key: Tuple[str, str, str], outcome: Dict[str, Any]):
+        current = self._outcomes.get(outcome_key)
+        if current is not None and current['arrivalTime'] is not None and (
+            outcome['arrivalTime'] is None or current['arrivalTime'] <= outcome['arrivalTime']
+        ):
+            return
+        self._outcomes[outcome_key] = outcome
+
+    def _evict_idle(self, today: str):
+        # Today and yesterday stay loaded; older dates (backfills) stay while
+        # arrivals keep coming and go once idle, instead of reloading each flush
+        yesterday = (datetime.strptime(today, DATE_FORMAT) - timedelta(days=1)).strftime(DATE_FORMAT)
+        idle_before = time.time() - self.idle_seconds
+        for business_date in [business_date for business_date, state in self._states.items()
+                              if business_date < yesterday and state.used_at < idle_before]:
+            del self._states[business_date]
+
+    async def _write_outcomes(self):
+        if not self._outcomes:
+            return
+        outcomes, self._outcomes = self._outcomes, {}
+        requests_by_collection = defaultdict(list)
+        for (business_date, event_name, event_status), outcome in outcomes.items():
+            requests_by_collection[self.partitioner.collection_name(business_date)].append(
+                self.outcome_update(business_date, event_name, event_status, outcome)
+            )
+        try:
+            for collection_name, requests in requests_by_collection.items():
+                await self._bulk_upsert(self.db[collection_name], requests)
+            if settings.EVENT_ROLLUPS_ENABLED:
+                await MonthlyRollupService(self.db).record_outcomes([
+                    {'businessDate': business_date, 'eventName': event_name, 'eventStatus': event_status,
+                     'outcomeStatus': outcome['status']}
+                    for (business_date, event_name, event_status), outcome in outcomes.items()
+                ])
+        except Exception:
+            # Keep them for the next flush; the updates are idempotent
+            for outcome_key, outcome in outcomes.items():
+                self._merge_outcome(outcome_key, outcome)
+            raise
+        self.written += len(outcomes)
+        await bump_business_date_versions(sla_scope(business_date) for business_date, _, _ in outcomes)
+
+    @staticmethod
+    async def _bulk_upsert(collection, requests: List[UpdateOne]):
+        try:
+            await collection.bulk_write(requests, ordered=False)
+        except BulkWriteError as e:
+            # Another worker inserted the same outcome first (unique index);
+            # re-running the upsert now matches and merges into its document
+            errors = e.details.get('writeErrors', [])
+            if not errors or any(error.get('code') != 11000 for error in errors):
+                raise
+            await collection.bulk_write([requests[error['index']] for error in errors], ordered=False)
+
+    @staticmethod
+    def outcome_update(business_date: str, event_name: str, event_status: str, outcome: Dict[str, Any]) -> UpdateOne:
+        fields = {
+            'eventId': {'$literal': f"OUT#{event_name}#{event_status}#{business_date}"},
+            'expectationId': {'$literal': outcome['expectationId']},
+            'deadline': {'$literal': outcome['deadline']},
+            'outcomeStatus': merge_outcome_expr('$outcomeStatus', outcome['status']),
+            'updatedAt': '$$NOW',
+        }
+        if outcome['arrivalTime'] is not None:
+            arrival = outcome['arrivalTime']
+            fields['arrivalTime'] = {'$min': [{'$ifNull': ['$arrivalTime', arrival]}, arrival]}
+            fields['arrivalEventId'] = {'$cond': [
+                {'$lt': [arrival, {'$ifNull': ['$arrivalTime', arrival]}]},
+                {'$literal': outcome['arrivalEventId']},
+                {'$ifNull': ['$arrivalEventId', {'$literal': outcome['arrivalEventId']}]},
+            ]}
+        return UpdateOne(
+            {'type': 'outcome', 'businessDate': business_date, 'eventName': event_name, 'eventStatus': event_status},
+            [{'$set': fields}],
+            upsert=True
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'business_dates': len(self._states),
+            'expectations': sum(len(state.expectations) for state in self._states.values()),
+            'resolved': sum(len(state.resolved) for state in self._states.values()),
+            'pending_arrivals': len(self._arrivals),
+            'pending_outcomes': len(self._outcomes),
+            'outcomes_written': self.written,
+            'outcomes': dict(self.counts),
+        }
+
+_evaluator: Optional[SlaEvaluator] = None
+
+def get_sla_evaluator() -> Optional[SlaEvaluator]:
+    return _evaluator
+
+async def start_sla_evaluator(db):
+    global _evaluator
+    if not settings.SLA_EVALUATOR_ENABLED or _evaluator is not None:
+        return
+    _evaluator = SlaEvaluator(
+        db,
+        flush_interval_ms=settings.SLA_FLUSH_INTERVAL_MS,
+        grace_seconds=settings.SLA_GRACE_SECONDS,
+        tick_seconds=settings.SLA_TIMER_TICK_SECONDS,
+        slots=settings.SLA_TIMER_SLOTS,
+        refresh_seconds=settings.SLA_EXPECTATIONS_REFRESH_SECONDS,
+        idle_seconds=settings.SLA_DATE_IDLE_SECONDS,
+    )
+    _evaluator.start()
+
+async def stop_sla_evaluator():
+    global _evaluator
+    if _evaluator is None:
+        return
+    await _evaluator.stop()
+    _evaluator = None
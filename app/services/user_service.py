@@ -1,18 +1,22 @@
-import bcrypt
 from typing import List, Dict, Any
 from bson import ObjectId
 
+from app.utils.password_hasher import get_password_hasher
+
 class UserService:
     def __init__(self, db):
         self.db = db
         self.user_collection = self.db['users']
 
     async def add_new_user(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
-        hashed_password = bcrypt.hashpw(user_data['password'].encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        hashed_password = await get_password_hasher().hash(user_data['password'])
         user_data['password'] = hashed_password
         user_data['favourite_groups'] = []
+        # Registration is open, so admin rights are only ever granted on the stored document
+        user_data['admin'] = False
         result = await self.user_collection.insert_one(user_data)
-        return await self.user_collection.find_one({'_id': result.inserted_id})
+        user_data['_id'] = result.inserted_id
+        return user_data
 
     async def delete_user_by_email(self, email: str):
         await self.user_collection.delete_one({'email': email})
@@ -22,8 +26,9 @@ class UserService:
 
     async def change_password(self, email: str, old_password: str, new_password: str) -> Dict[str, Any]:
         user = await self.user_collection.find_one({'email': email})
-        if user and bcrypt.checkpw(old_password.encode('utf-8'), user['password'].encode('utf-8')):
-            new_hashed_password = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        password_hasher = get_password_hasher()
+        if user and await password_hasher.verify(old_password, user['password']):
+            new_hashed_password = await password_hasher.hash(new_password)
             await self.user_collection.update_one(
                 {'email': email},
                 {'$set': {'password': new_hashed_password}}
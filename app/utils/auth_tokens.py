@@ -0,0 +1,174 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from fastapi import Header, HTTPException
+
+from app.config import settings
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+REVOKED_KEY_PREFIX = 'auth-revoked:'
+REVOKED_CHANNEL = 'auth-revoked'
+
+class InvalidToken(Exception):
+    pass
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+class TokenSigner:
+    """Stateless HMAC-SHA256 access tokens: base64(payload).base64(signature)."""
+
+    def __init__(self, secret_key: str, ttl_seconds: int):
+        self.secret_key = secret_key.encode('utf-8')
+        self.ttl = ttl_seconds
+
+    def _sign(self, payload: str) -> str:
+        return _b64encode(hmac.new(self.secret_key, payload.encode('ascii'), hashlib.sha256).digest())
+
+    def issue(self, subject: str, admin: bool = False) -> Dict[str, Any]:
+        claims = {'sub': subject, 'exp': int(time.time()) + self.ttl, 'jti': uuid.uuid4().hex}
+        if admin:
+            claims['admin'] = True
+        payload = _b64encode(json.dumps(claims, separators=(',', ':')).encode('utf-8'))
+        return {'access_token': f"{payload}.{self._sign(payload)}", 'claims': claims}
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        try:
+            payload, signature = token.split('.', 1)
+        except ValueError:
+            raise InvalidToken("Malformed token")
+        try:
+            # Both sides must be ASCII for _sign and compare_digest
+            valid = hmac.compare_digest(signature.encode('ascii'), self._sign(payload).encode('ascii'))
+        except UnicodeEncodeError:
+            raise InvalidToken("Malformed token")
+        if not valid:
+            raise InvalidToken("Invalid token signature")
+        try:
+            claims = json.loads(_b64decode(payload))
+        except ValueError:
+            raise InvalidToken("Malformed token")
+        if not isinstance(claims, dict) or not isinstance(claims.get('exp'), (int, float)) \
+                or 'sub' not in claims or 'jti' not in claims:
+            raise InvalidToken("Malformed token")
+        if claims.get('exp', 0) < time.time():
+            raise InvalidToken("Token expired")
+        return claims
+
+class RevocationList:
+    """Revoked token ids kept in memory on every worker. Revocations are
+    stored in Redis with the token's remaining lifetime and broadcast over
+    pub/sub so other workers learn about them without a lookup per request."""
+
+    def __init__(self, redis_client=None):
+        self.redis = redis_client
+        self._revoked: Dict[str, int] = {}
+        self._listener: Optional[asyncio.Task] = None
+
+    def is_revoked(self, claims: Dict[str, Any]) -> bool:
+        return claims['jti'] in self._revoked
+
+    def _add(self, jti: str, expires_at: int):
+        now = time.time()
+        if expires_at > now:
+            self._revoked[jti] = expires_at
+        # Entries past their token's expiry can never match a valid token again
+        if len(self._revoked) > 1000:
+            self._revoked = {key: value for key, value in self._revoked.items() if value > now}
+
+    async def revoke(self, claims: Dict[str, Any]):
+        self._add(claims['jti'], claims['exp'])
+        if self.redis is None:
+            return
+        ttl = max(int(claims['exp'] - time.time()), 1)
+        message = f"{claims['jti']}:{claims['exp']}"
+        try:
+            await self.redis.set(f"{REVOKED_KEY_PREFIX}{claims['jti']}", claims['exp'], ex=ttl)
+            await self.redis.publish(REVOKED_CHANNEL, message)
+        except Exception as e:
+            logger.warning(f"Failed to broadcast token revocation: {str(e)}")
+
+    async def start(self):
+        if self.redis is None:
+            return
+        try:
+            async for key in self.redis.scan_iter(match=f"{REVOKED_KEY_PREFIX}*"):
+                expires_at = await self.redis.get(key)
+                if expires_at is not None:
+                    self._add(key.decode()[len(REVOKED_KEY_PREFIX):], int(expires_at))
+        except Exception as e:
+            logger.warning(f"Failed to load revoked tokens: {str(e)}")
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+        if self.redis is not None:
+            await self.redis.close()
+
+    async def _listen(self):
+        while True:
+            try:
+                pubsub = self.redis.pubsub()
+                await pubsub.subscribe(REVOKED_CHANNEL)
+                async for message in pubsub.listen():
+                    if message['type'] == 'message':
+                        jti, expires_at = message['data'].decode().split(':', 1)
+                        self._add(jti, int(expires_at))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Token revocation listener error: {str(e)}")
+                await asyncio.sleep(1)
+
+token_signer = TokenSigner(settings.SECRET_KEY, settings.ACCESS_TOKEN_TTL_SECONDS) if settings.SECRET_KEY else None
+
+def require_secret_key():
+    # A per-process fallback key would make every worker reject the others' tokens
+    if token_signer is None:
+        raise RuntimeError("SECRET_KEY must be set; it signs access tokens shared by all workers")
+
+revocation_list = RevocationList()
+
+async def start_revocation_list():
+    global revocation_list
+    if settings.REDIS_URL:
+        import redis.asyncio as aioredis
+        revocation_list = RevocationList(aioredis.from_url(settings.REDIS_URL))
+    await revocation_list.start()
+
+async def stop_revocation_list():
+    await revocation_list.stop()
+
+async def get_current_user(authorization: Optional[str] = Header(None)) -> Dict[str, Any]:
+    if not authorization or not authorization.lower().startswith('bearer '):
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    try:
+        claims = token_signer.verify(authorization[7:].strip())
+    except InvalidToken as e:
+        raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+    if revocation_list.is_revoked(claims):
+        raise HTTPException(status_code=401, detail="Token revoked", headers={"WWW-Authenticate": "Bearer"})
+    return claims
+
+async def get_admin_user(authorization: Optional[str] = Header(None)) -> Dict[str, Any]:
+    claims = await get_current_user(authorization)
+    if not claims.get('admin'):
+        raise HTTPException(status_code=403, detail="Admin privileges required")
+    return claims
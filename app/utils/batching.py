@@ -0,0 +1,65 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Collects items and hands them to `flush` in batches of at most
+    `max_batch_size`, waiting no longer than `max_latency_ms` for a batch to
+    fill. stop() drains whatever is still queued before returning."""
+
+    def __init__(self, flush: Callable[[List[Any]], Awaitable[None]], max_batch_size: int, max_latency_ms: int):
+        self.flush = flush
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000
+        self._pending: List[Any] = []
+        self._has_items = asyncio.Event()
+        self._batch_ready = asyncio.Event()
+        self.closing = False
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, item: Any):
+        self._pending.append(item)
+        self._has_items.set()
+        if len(self._pending) >= self.max_batch_size:
+            self._batch_ready.set()
+
+    def start(self):
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        self.closing = True
+        self._has_items.set()
+        self._batch_ready.set()
+        if self._task:
+            await self._task
+
+    async def run(self):
+        while True:
+            await self._has_items.wait()
+            if len(self._pending) < self.max_batch_size and not self.closing:
+                try:
+                    await asyncio.wait_for(self._batch_ready.wait(), timeout=self.max_latency)
+                except asyncio.TimeoutError:
+                    pass
+
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            if len(self._pending) < self.max_batch_size:
+                self._batch_ready.clear()
+            if not self._pending:
+                self._has_items.clear()
+
+            if batch:
+                try:
+                    await self.flush(batch)
+                except Exception as e:
+                    # flush owns the batch's outcome; an escaped error must not end the loop
+                    logger.error(f"Error flushing batch of {len(batch)}: {str(e)}", exc_info=True)
+            if self.closing and not self._pending:
+                break
@@ -0,0 +1,189 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import redis.asyncio as aioredis
+from bson import json_util
+
+from app.config import settings
+from app.utils.metrics import registry
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+cache_lookups = registry.counter(
+    'two_tier_cache_lookups_total', 'Two-tier cache lookups by cache and result (local_hit, redis_hit, miss).',
+    ('cache', 'result'))
+cache_evictions = registry.counter('two_tier_cache_evictions_total', 'Local LRU evictions by cache.', ('cache',))
+cache_invalidations = registry.counter(
+    'two_tier_cache_invalidations_total', 'Namespace invalidations issued by cache.', ('cache',))
+
+class TwoTierCache:
+    """Per-worker LRU/TTL cache in front of a shared Redis tier.
+
+    Entries live in namespaces. Redis keys embed a per-namespace version
+    counter, so invalidating a namespace is one INCR (old keys simply age
+    out) plus a pub/sub message telling every worker to drop its local
+    copies. A load that started before an invalidation writes back under
+    the old version and never becomes visible."""
+
+    def __init__(self, redis_client: Optional[aioredis.Redis], max_entries: int, ttl_seconds: int,
+                 prefix: str = 'tier-cache:', channel: str = 'tier-cache-invalidate'):
+        self.redis = redis_client
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self.prefix = prefix
+        self.channel = channel
+        self.name = prefix.rstrip(':')
+        self._local: 'OrderedDict[Tuple[str, str], Tuple[float, Any]]' = OrderedDict()
+        self._local_generations: Dict[str, int] = {}
+        self._listener: Optional[asyncio.Task] = None
+
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _version_key(self, namespace: str) -> str:
+        return f"{self.prefix}{namespace}:version"
+
+    def _redis_key(self, namespace: str, version: int, key: str) -> str:
+        return f"{self.prefix}{namespace}:v{version}:{key}"
+
+    async def get_or_load(self, namespace: str, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        local_key = (namespace, key)
+        entry = self._local.get(local_key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._local.move_to_end(local_key)
+                self.local_hits += 1
+                cache_lookups.inc(cache=self.name, result='local_hit')
+                return value
+            del self._local[local_key]
+
+        generation = self._local_generations.get(namespace, 0)
+        redis_key = None
+        if self.redis is not None:
+            try:
+                version = int(await self.redis.get(self._version_key(namespace)) or 0)
+                redis_key = self._redis_key(namespace, version, key)
+                cached = await self.redis.get(redis_key)
+            except Exception as e:
+                logger.warning(f"Redis cache read failed: {str(e)}")
+                cached = None
+            if cached is not None:
+                value = json_util.loads(cached)
+                self._set_local(local_key, value, generation)
+                self.redis_hits += 1
+                cache_lookups.inc(cache=self.name, result='redis_hit')
+                return value
+
+        self.misses += 1
+        cache_lookups.inc(cache=self.name, result='miss')
+        value = await loader()
+        self._set_local(local_key, value, generation)
+        if redis_key is not None:
+            try:
+                await self.redis.set(redis_key, json_util.dumps(value), ex=self.ttl)
+            except Exception as e:
+                logger.warning(f"Redis cache write failed: {str(e)}")
+        return value
+
+    def _set_local(self, local_key: Tuple[str, str], value: Any, generation: int):
+        if self._local_generations.get(local_key[0], 0) != generation:
+            # The namespace was invalidated while this value was loading
+            return
+        self._local[local_key] = (time.monotonic() + self.ttl, value)
+        self._local.move_to_end(local_key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+            self.evictions += 1
+            cache_evictions.inc(cache=self.name)
+
+    def invalidate_local(self, namespace: str):
+        self._local_generations[namespace] = self._local_generations.get(namespace, 0) + 1
+        for local_key in [local_key for local_key in self._local if local_key[0] == namespace]:
+            del self._local[local_key]
+
+    async def invalidate(self, namespace: str):
+        self.invalidations += 1
+        cache_invalidations.inc(cache=self.name)
+        self.invalidate_local(namespace)
+        if self.redis is None:
+            return
+        try:
+            await self.redis.incr(self._version_key(namespace))
+            await self.redis.publish(self.channel, namespace)
+        except Exception as e:
+            logger.warning(f"Redis cache invalidation failed: {str(e)}")
+
+    def start(self):
+        if self.redis is not None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+
+    async def _listen(self):
+        while True:
+            try:
+                pubsub = self.redis.pubsub()
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    if message['type'] == 'message':
+                        self.invalidate_local(message['data'].decode())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Invalidations may have been missed while disconnected
+                logger.warning(f"Cache invalidation listener error: {str(e)}")
+                self._local.clear()
+                await asyncio.sleep(1)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'local_entries': len(self._local),
+            'local_hits': self.local_hits,
+            'redis_hits': self.redis_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+        }
+
+_stats_cache: Optional[TwoTierCache] = None
+
+def get_stats_cache() -> Optional[TwoTierCache]:
+    return _stats_cache
+
+async def start_stats_cache():
+    global _stats_cache
+    if not settings.STATS_CACHE_ENABLED or _stats_cache is not None:
+        return
+    redis_client = aioredis.from_url(settings.REDIS_URL) if settings.REDIS_URL else None
+    _stats_cache = TwoTierCache(
+        redis_client,
+        max_entries=settings.STATS_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.STATS_CACHE_TTL_SECONDS,
+        prefix='stats-cache:',
+        channel='stats-cache-invalidate',
+    )
+    _stats_cache.start()
+    logger.info("Statistics cache started")
+
+async def stop_stats_cache():
+    global _stats_cache
+    if _stats_cache is None:
+        return
+    await _stats_cache.stop()
+    if _stats_cache.redis is not None:
+        await _stats_cache.redis.close()
+    _stats_cache = None
@@ -0,0 +1,35 @@
+from typing import Any, Optional
+
+import orjson
+from bson import ObjectId
+from starlette.responses import Response
+
+from app.config import settings
+from app.utils.timing import span
+
+def _bson_default(value: Any):
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_bson_default)
+
+class BSONJSONResponse(Response):
+    """JSON response for documents that are already in their output shape.
+
+    Skips response_model validation and jsonable_encoder; orjson encodes
+    datetime natively and ObjectId falls back to its hex string."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        with span('serialization'):
+            return dumps(content)
+
+def fast_response(content: Any, headers: Optional[dict] = None):
+    # Documents are projected to their output shape in the query, so with
+    # FAST_JSON_RESPONSES they can bypass response_model validation
+    if settings.FAST_JSON_RESPONSES:
+        return BSONJSONResponse(content, headers=headers)
+    return content
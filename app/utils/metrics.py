@@ -0,0 +1,347 @@
+import asyncio
+import json
+import os
+import socket
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pymongo import monitoring
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+WORKER_KEY_PREFIX = 'metrics:worker:'
+
+class _Metric:
+    """Samples are sharded by thread id, so the event loop and Motor's
+    executor threads each only ever write their own dict and no lock is
+    taken on the hot path; collect() sums the shards."""
+
+    type = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._shards: Dict[int, Dict[Tuple[str, ...], Any]] = {}
+
+    def _shard(self) -> Dict[Tuple[str, ...], Any]:
+        ident = threading.get_ident()
+        shard = self._shards.get(ident)
+        if shard is None:
+            shard = self._shards.setdefault(ident, {})
+        return shard
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'type': self.type,
+            'help': self.documentation,
+            'labelnames': list(self.labelnames),
+            'samples': [[list(key), value] for key, value in self.collect().items()],
+        }
+
+class Counter(_Metric):
+    type = 'counter'
+
+    def inc(self, amount: float = 1, **labels: str):
+        shard = self._shard()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def collect(self) -> Dict[Tuple[str, ...], float]:
+        totals: Dict[Tuple[str, ...], float] = {}
+        for shard in list(self._shards.values()):
+            for key, value in list(shard.items()):
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+class Gauge(Counter):
+    type = 'gauge'
+
+    def dec(self, amount: float = 1, **labels: str):
+        self.inc(-amount, **labels)
+
+class Histogram(_Metric):
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels: str):
+        shard = self._shard()
+        key = self._key(labels)
+        sample = shard.get(key)
+        if sample is None:
+            # per-bucket counts (last slot is +Inf), then sum
+            sample = shard[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        sample[bisect_left(self.buckets, value)] += 1
+        sample[-1] += value
+
+    def collect(self) -> Dict[Tuple[str, ...], List[float]]:
+        totals: Dict[Tuple[str, ...], List[float]] = {}
+        for shard in list(self._shards.values()):
+            for key, sample in list(shard.items()):
+                total = totals.get(key)
+                if total is None:
+                    totals[key] = list(sample)
+                else:
+                    for i, value in enumerate(sample):
+                        total[i] += value
+        return totals
+
+    def snapshot(self) -> Dict[str, Any]:
+        snapshot = super().snapshot()
+        snapshot['buckets'] = list(self.buckets)
+        return snapshot
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+def merge_snapshots(snapshots: Iterable[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """Sums counters, gauges and histogram buckets of the same series across workers."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.get(name)
+            if target is None:
+                target = merged[name] = {**metric, 'samples': {}}
+            for labels, value in metric['samples']:
+                key = tuple(labels)
+                current = target['samples'].get(key)
+                if current is None:
+                    target['samples'][key] = list(value) if isinstance(value, list) else value
+                elif isinstance(value, list):
+                    target['samples'][key] = [a + b for a, b in zip(current, value)]
+                else:
+                    target['samples'][key] = current + value
+    return merged
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def render_prometheus(merged: Dict[str, Dict[str, Any]]) -> str:
+    lines = []
+    for name, metric in sorted(merged.items()):
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        labelnames = metric['labelnames']
+        for labels, value in sorted(metric['samples'].items()):
+            if metric['type'] != 'histogram':
+                lines.append(f"{name}{_labels(labelnames, labels)} {_number(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip(metric['buckets'] + ['+Inf'], value[:-1]):
+                cumulative += count
+                le = bound if bound == '+Inf' else repr(float(bound))
+                lines.append(f"{name}_bucket{_labels(labelnames, labels, ('le', le))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labelnames, labels)} {_number(value[-1])}")
+            lines.append(f"{name}_count{_labels(labelnames, labels)} {cumulative}")
+    return '\n'.join(lines) + '\n'
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    'http_requests_total', 'HTTP requests by route template, method and status.', ('route', 'method', 'status'))
+http_request_duration = registry.histogram(
+    'http_request_duration_seconds', 'HTTP request latency by route template, method and status.',
+    ('route', 'method', 'status'))
+http_in_flight = registry.gauge('http_requests_in_flight', 'HTTP requests currently being served.')
+mongo_command_duration = registry.histogram(
+    'mongodb_command_duration_seconds', 'MongoDB command latency by collection and command.',
+    ('collection', 'command', 'outcome'))
+
+class MetricsMiddleware:
+    """Pure ASGI request counter. The route label is the matched path
+    template, never the raw path, so label cardinality stays bounded."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started_at = time.perf_counter()
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_in_flight.dec()
+            route = scope.get('route')
+            labels = {
+                'route': getattr(route, 'path', 'unmatched'),
+                'method': scope['method'],
+                'status': str(status),
+            }
+            http_requests.inc(**labels)
+            http_request_duration.observe(time.perf_counter() - started_at, **labels)
+
+def _collection_name(command_name: str, command: Dict[str, Any]) -> str:
+    if command_name == 'getMore':
+        return str(command.get('collection', ''))
+    target = command.get(command_name)
+    return target if isinstance(target, str) else ''
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Times every MongoDB command into mongodb_command_duration_seconds and
+    logs the ones slower than METRICS_SLOW_QUERY_MS. Runs on Motor's
+    executor threads."""
+
+    def __init__(self, slow_query_ms: int):
+        self.slow_query_seconds = slow_query_ms / 1000 if slow_query_ms > 0 else None
+        self._started: Dict[Tuple[Any, int], Tuple[str, Dict[str, Any]]] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        command = event.command
+        self._started[(event.connection_id, event.request_id)] = (_collection_name(event.command_name, command), command)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        self._finish(event, 'success')
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        self._finish(event, 'failure')
+
+    def _finish(self, event, outcome: str):
+        collection, command = self._started.pop((event.connection_id, event.request_id), ('', {}))
+        seconds = event.duration_micros / 1_000_000
+        mongo_command_duration.observe(seconds, collection=collection, command=event.command_name, outcome=outcome)
+        if self.slow_query_seconds is not None and seconds >= self.slow_query_seconds:
+            summary = {key: command[key] for key in ('filter', 'pipeline', 'sort', 'limit', 'updates', 'deletes') if key in command}
+            logger.warning(
+                f"Slow MongoDB {event.command_name} on {event.database_name}.{collection or '-'} "
+                f"took {seconds * 1000:.1f}ms ({outcome}): {str(summary)[:1000]}"
+            )
+
+def command_listeners() -> List[monitoring.CommandListener]:
+    if not settings.METRICS_ENABLED:
+        return []
+    return [CommandMetricsListener(settings.METRICS_SLOW_QUERY_MS)]
+
+class MetricsPublisher:
+    """Periodically stores this worker's snapshot in Redis so that any
+    worker answering /metrics can report the sum over all of them."""
+
+    def __init__(self, redis_client, interval_seconds: int):
+        self.redis = redis_client
+        self.interval = interval_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        try:
+            await self.redis.delete(WORKER_KEY_PREFIX + self.worker_id)
+        except Exception as e:
+            logger.warning(f"Failed to remove metrics snapshot: {str(e)}")
+        await self.redis.close()
+
+    async def _run(self):
+        while True:
+            await self.publish()
+            await asyncio.sleep(self.interval)
+
+    async def publish(self):
+        try:
+            await self.redis.set(WORKER_KEY_PREFIX + self.worker_id, json.dumps(registry.snapshot()), ex=self.interval * 3)
+        except Exception as e:
+            logger.warning(f"Failed to publish metrics snapshot: {str(e)}")
+
+    async def collect_all(self) -> List[Dict[str, Dict[str, Any]]]:
+        snapshots = [registry.snapshot()]
+        try:
+            async for key in self.redis.scan_iter(match=f"{WORKER_KEY_PREFIX}*"):
+                if key.decode() == WORKER_KEY_PREFIX + self.worker_id:
+                    continue
+                payload = await self.redis.get(key)
+                if payload is not None:
+                    snapshots.append(json.loads(payload))
+        except Exception as e:
+            logger.warning(f"Failed to read worker metrics snapshots: {str(e)}")
+        return snapshots
+
+_publisher: Optional[MetricsPublisher] = None
+
+def get_metrics_publisher() -> Optional[MetricsPublisher]:
+    return _publisher
+
+async def start_metrics_publisher():
+    global _publisher
+    if not settings.METRICS_ENABLED or not settings.REDIS_URL:
+        return
+    import redis.asyncio as aioredis
+    _publisher = MetricsPublisher(aioredis.from_url(settings.REDIS_URL), settings.METRICS_PUBLISH_INTERVAL_SECONDS)
+    await _publisher.start()
+
+async def stop_metrics_publisher():
+    global _publisher
+    if _publisher is not None:
+        await _publisher.stop()
+        _publisher = None
+
+async def render_metrics(scope: str = 'all') -> str:
+    publisher = get_metrics_publisher()
+    if scope == 'all' and publisher is not None:
+        snapshots = await publisher.collect_all()
+    else:
+        snapshots = [registry.snapshot()]
+    return render_prometheus(merge_snapshots(snapshots))
@@ -0,0 +1,111 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import bcrypt
+
+from app.config import settings
+from app.utils.metrics import registry
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+password_hash_duration = registry.histogram(
+    'password_hash_duration_seconds', 'bcrypt hash/verify time on the hashing pool.', ('operation',))
+password_hash_queue_wait = registry.histogram(
+    'password_hash_queue_wait_seconds', 'Time bcrypt calls waited for a hashing pool worker.', ('operation',))
+password_hash_rejected = registry.counter(
+    'password_hash_rejected_total', 'bcrypt calls shed because too many were queued.', ('operation',))
+password_hash_pending = registry.gauge('password_hash_pending', 'bcrypt calls queued or running.')
+
+class PasswordHasherBusy(Exception):
+    pass
+
+def _timed_call(fn: Callable, *args) -> tuple:
+    started_at = time.monotonic()
+    return fn(*args), started_at
+
+def _hash_password(password: bytes) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt())
+
+class PasswordHasher:
+    """Runs bcrypt on a dedicated, size-limited pool so hashing never blocks
+    the event loop, and sheds work once too many calls are queued."""
+
+    def __init__(self, executor: Executor, max_pending: int):
+        self.executor = executor
+        self.max_pending = max_pending
+        self._pending = 0
+        self.rejected = 0
+        self._timings: Dict[str, Dict[str, float]] = {}
+
+    async def hash(self, password: str) -> str:
+        hashed = await self._submit('hash', _hash_password, password.encode('utf-8'))
+        return hashed.decode('utf-8')
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._submit('verify', bcrypt.checkpw, password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+    async def _submit(self, operation: str, fn: Callable, *args) -> Any:
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            password_hash_rejected.inc(operation=operation)
+            raise PasswordHasherBusy()
+        self._pending += 1
+        password_hash_pending.inc()
+        submitted_at = time.monotonic()
+        try:
+            result, started_at = await asyncio.get_running_loop().run_in_executor(self.executor, _timed_call, fn, *args)
+        finally:
+            self._pending -= 1
+            password_hash_pending.dec()
+        finished_at = time.monotonic()
+        self._record(operation, started_at - submitted_at, finished_at - started_at)
+        return result
+
+    def _record(self, operation: str, queue_wait: float, latency: float):
+        password_hash_queue_wait.observe(queue_wait, operation=operation)
+        password_hash_duration.observe(latency, operation=operation)
+        timing = self._timings.setdefault(operation, {
+            'count': 0, 'queue_wait_total_ms': 0.0, 'queue_wait_max_ms': 0.0, 'latency_total_ms': 0.0, 'latency_max_ms': 0.0,
+        })
+        timing['count'] += 1
+        timing['queue_wait_total_ms'] += queue_wait * 1000
+        timing['queue_wait_max_ms'] = max(timing['queue_wait_max_ms'], queue_wait * 1000)
+        timing['latency_total_ms'] += latency * 1000
+        timing['latency_max_ms'] = max(timing['latency_max_ms'], latency * 1000)
+
+    def stats(self) -> Dict[str, Any]:
+        operations = {}
+        for operation, timing in self._timings.items():
+            operations[operation] = {
+                'count': timing['count'],
+                'avg_queue_wait_ms': timing['queue_wait_total_ms'] / timing['count'],
+                'max_queue_wait_ms': timing['queue_wait_max_ms'],
+                'avg_latency_ms': timing['latency_total_ms'] / timing['count'],
+                'max_latency_ms': timing['latency_max_ms'],
+            }
+        return {'pending': self._pending, 'max_pending': self.max_pending, 'rejected': self.rejected, 'operations': operations}
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+_password_hasher: Optional[PasswordHasher] = None
+
+def get_password_hasher() -> PasswordHasher:
+    global _password_hasher
+    if _password_hasher is None:
+        if settings.PASSWORD_HASH_EXECUTOR == 'process':
+            executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+        else:
+            executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix='bcrypt')
+        _password_hasher = PasswordHasher(executor, max_pending=settings.PASSWORD_HASH_MAX_PENDING)
+    return _password_hasher
+
+def shutdown_password_hasher():
+    global _password_hasher
+    if _password_hasher is not None:
+        _password_hasher.shutdown()
+        _password_hasher = None
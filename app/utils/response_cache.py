@@ -0,0 +1,145 @@
+import json
+import secrets
+import time
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+import redis.asyncio as aioredis
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.redis import RedisBackend
+
+from app.config import settings
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+def init_response_cache():
+    pool = aioredis.ConnectionPool.from_url(settings.REDIS_URL, max_connections=settings.REDIS_MAX_CONNECTIONS)
+    FastAPICache.init(RedisBackend(aioredis.Redis(connection_pool=pool)), prefix="fastapi-cache")
+
+def _redis():
+    try:
+        return FastAPICache.get_backend().redis
+    except (AssertionError, AttributeError):
+        return None
+
+def _version_key(business_date: str) -> str:
+    return f"{FastAPICache.get_prefix()}:version:{business_date}"
+
+def _bumped_at_key(business_date: str) -> str:
+    return f"{FastAPICache.get_prefix()}:version-at:{business_date}"
+
+def _epoch_key() -> str:
+    return f"{FastAPICache.get_prefix()}:version-epoch"
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+async def _read_version(redis, business_date: str):
+    epoch, version, bumped_at = await redis.mget(_epoch_key(), _version_key(business_date), _bumped_at_key(business_date))
+    if epoch is None:
+        # First use, a flushed Redis or invalidate_all_business_dates():
+        # counters may have restarted, so nothing issued before is valid
+        await redis.set(_epoch_key(), secrets.token_hex(4), nx=True)
+        epoch = await redis.get(_epoch_key())
+    version = f"{epoch.decode()}.{int(version) if version is not None else 0}"
+    return version, float(bumped_at) if bumped_at is not None else None
+
+async def get_business_date_version(business_date: str) -> Optional[str]:
+    redis = _redis()
+    if redis is None:
+        return None
+    version, _ = await _read_version(redis, business_date)
+    return version
+
+async def invalidate_all_business_dates():
+    """For writes that cannot name their business dates (dropping a partition)."""
+    redis = _redis()
+    if redis is None:
+        return
+    try:
+        await redis.delete(_epoch_key())
+    except Exception as e:
+        logger.warning(f"Failed to reset response cache versions: {str(e)}")
+
+async def bump_business_date_versions(business_dates: Iterable[str]):
+    redis = _redis()
+    business_dates = set(business_dates)
+    if redis is None or not business_dates:
+        return
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            now = time.time()
+            for business_date in business_dates:
+                pipe.incr(_version_key(business_date))
+                pipe.set(_bumped_at_key(business_date), now)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Failed to bump response cache versions: {str(e)}")
+
+async def cached_for_business_date(namespace: str, business_date: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+    """Serve a JSON-able read from the response cache. Keys embed the
+    business date's version counter, so a bump orphans every cached response
+    for that date and they simply age out. Responses for a date that is still
+    being written to (bumped within RESPONSE_CACHE_MIN_QUIET_SECONDS) are not
+    stored: the next bump would orphan them before anyone read them."""
+    redis = _redis()
+    if redis is None:
+        return await loader()
+    try:
+        version, bumped_at = await _read_version(redis, business_date)
+        key = f"{FastAPICache.get_prefix()}:{namespace}:{business_date}:{version}"
+        cached = await redis.get(key)
+    except Exception as e:
+        logger.warning(f"Response cache read failed: {str(e)}")
+        return await loader()
+    if cached is not None:
+        return json.loads(cached)
+
+    value = await loader()
+    if bumped_at is not None and time.time() - bumped_at < settings.RESPONSE_CACHE_MIN_QUIET_SECONDS:
+        return value
+    try:
+        await redis.set(key, json.dumps(value, default=_json_default), ex=settings.RESPONSE_CACHE_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"Response cache write failed: {str(e)}")
+    return value
+
+def _min_version_age() -> float:
+    # A replica may still return pre-bump data for a while; tagging that
+    # with the new version would pin clients to it, so wait it out
+    if settings.MONGODB_READ_PREFERENCE == 'primary':
+        return 0
+    return max(settings.MONGODB_READ_MAX_STALENESS_SECONDS, 90)
+
+async def business_date_etag(namespace: str, business_date: str) -> Optional[str]:
+    """Weak ETag for a read that depends only on `business_date`'s data, or
+    None when no safe tag can be issued (no Redis, or a version too fresh
+    for replica reads)."""
+    redis = _redis()
+    if redis is None:
+        return None
+    try:
+        version, bumped_at = await _read_version(redis, business_date)
+    except Exception as e:
+        logger.warning(f"Response cache version read failed: {str(e)}")
+        return None
+    min_age = _min_version_age()
+    if min_age and bumped_at is not None and time.time() - bumped_at < min_age:
+        return None
+    return f'W/"{namespace}:{business_date}:{version}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if (candidate[2:] if candidate.startswith('W/') else candidate) == opaque:
+            return True
+    return False
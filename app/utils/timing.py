@@ -0,0 +1,190 @@
+import asyncio
+import time
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi.routing import APIRoute
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+class RequestTiming:
+    __slots__ = ('started_at', 'phases', 'open_spans')
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.phases: Dict[str, List[float]] = {}
+        self.open_spans: Dict[int, Tuple[str, float]] = {}
+
+    def add(self, name: str, seconds: float):
+        phase = self.phases.setdefault(name, [0.0, 0])
+        phase[0] += seconds
+        phase[1] += 1
+
+    def server_timing(self) -> str:
+        """Header value as of now; spans still running (the compressor is
+        mid-call when GZipMiddleware emits the headers) count up to now."""
+        now = time.perf_counter()
+        phases = {name: list(phase) for name, phase in self.phases.items()}
+        for name, started_at in self.open_spans.values():
+            phase = phases.setdefault(name, [0.0, 0])
+            phase[0] += now - started_at
+            phase[1] += 1
+        entries = [
+            f'{name};dur={seconds * 1000:.2f};desc="{count}x"'
+            for name, (seconds, count) in phases.items()
+        ]
+        entries.append(f'total;dur={(now - self.started_at) * 1000:.2f}')
+        return ', '.join(entries)
+
+_current: ContextVar[Optional[RequestTiming]] = ContextVar('server_timing', default=None)
+_endpoint_marks: ContextVar[Optional[Dict[str, float]]] = ContextVar('server_timing_endpoint_marks', default=None)
+
+def record(name: str, seconds: float):
+    """Adds `seconds` to the named phase of the current request; a no-op
+    outside a request handled by ServerTimingMiddleware."""
+    timing = _current.get()
+    if timing is not None:
+        timing.add(name, seconds)
+
+class span:
+    """Times a block into the current request's Server-Timing header.
+
+        with span("db"):
+            await collection.find(...).to_list(None)
+    """
+
+    __slots__ = ('name', '_started_at', '_timing')
+
+    def __init__(self, name: str):
+        self.name = name
+        self._started_at = 0.0
+        self._timing = None
+
+    def __enter__(self):
+        self._timing = _current.get()
+        self._started_at = time.perf_counter()
+        if self._timing is not None:
+            self._timing.open_spans[id(self)] = (self.name, self._started_at)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._timing is not None:
+            self._timing.open_spans.pop(id(self), None)
+            self._timing.add(self.name, time.perf_counter() - self._started_at)
+        return False
+
+def timed(name: str):
+    """Decorator form of `span` for coroutine functions."""
+    def decorator(func: Callable):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            with span(name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+class ServerTimingMiddleware:
+    """Pure ASGI replacement for the old BaseHTTPMiddleware timer.
+
+    Opens a span collector for each HTTP request and, when the response
+    starts, reports every recorded phase plus the total in a Server-Timing
+    header. Streaming bodies pass through untouched."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming()
+        token = _current.set(timing)
+
+        async def send_with_timing(message: Message):
+            if message['type'] == 'http.response.start':
+                headers = MutableHeaders(scope=message)
+                headers.append('Server-Timing', timing.server_timing())
+                headers['X-Process-Time'] = f'{time.perf_counter() - timing.started_at:.6f}'
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+
+class CompressionTimingMiddleware:
+    """Installed directly inside GZipMiddleware: time spent in `send` below
+    this point is the compressor working on the body."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_timing(message: Message):
+            if message['type'] != 'http.response.body':
+                await send(message)
+                return
+            with span('compression'):
+                await send(message)
+
+        await self.app(scope, receive, send_with_timing)
+
+class TimedRoute(APIRoute):
+    """APIRoute that splits FastAPI's request handling into `validation`
+    (request parsing and dependencies, up to the endpoint call) and
+    `serialization` (response_model validation and JSON rendering)."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.dependant.call = _mark_endpoint(self.dependant.call)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            marks = {'received': time.perf_counter()}
+            token = _endpoint_marks.set(marks)
+            try:
+                response = await handler(request)
+            finally:
+                _endpoint_marks.reset(token)
+            if 'returned' in marks:
+                record('serialization', time.perf_counter() - marks['returned'])
+            return response
+
+        return timed_handler
+
+def _mark_endpoint(call: Callable) -> Callable:
+    def enter():
+        marks = _endpoint_marks.get()
+        if marks is not None:
+            marks['called'] = time.perf_counter()
+            record('validation', marks['called'] - marks['received'])
+        return marks
+
+    def leave(marks):
+        if marks is not None:
+            marks['returned'] = time.perf_counter()
+
+    if asyncio.iscoroutinefunction(call):
+        @wraps(call)
+        async def async_endpoint(**values):
+            marks = enter()
+            result = await call(**values)
+            leave(marks)
+            return result
+        return async_endpoint
+
+    @wraps(call)
+    def sync_endpoint(**values):
+        marks = enter()
+        result = call(**values)
+        leave(marks)
+        return result
+    return sync_endpoint
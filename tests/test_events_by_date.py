@@ -0,0 +1,82 @@
+import json
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+from app.database import get_read_db
+from app.routes import events
+
+BUSINESS_DATE = "2024-05-01"
+
+EVENT = {
+    "businessDate": BUSINESS_DATE,
+    "eventName": "LOAD_TRADES",
+    "eventType": "FILE",
+    "batchOrRealtime": "Batch",
+    "eventTime": datetime(2024, 5, 1, 6, 30),
+    "eventStatus": "SUCCESS",
+    "resource": "etl-01",
+    "details": {},
+    "eventId": "EVT#LOAD_TRADES#SUCCESS#1",
+    "type": "event",
+}
+
+# Generated expectations and SLA outcomes live in the events collection next to the events
+EXPECTATION = {
+    "businessDate": BUSINESS_DATE,
+    "eventName": "LOAD_TRADES",
+    "eventStatus": "SUCCESS",
+    "eventTime": datetime(2024, 5, 1, 6, 0),
+    "expectedLatestTime": datetime(2024, 5, 1, 7, 0),
+    "eventId": "EXP#LOAD_TRADES#SUCCESS#2024-05-01",
+    "type": "expectation",
+}
+
+OUTCOME = {
+    "businessDate": BUSINESS_DATE,
+    "eventName": "LOAD_TRADES",
+    "eventStatus": "SUCCESS",
+    "outcome": "ON_TIME",
+    "type": "outcome",
+}
+
+@pytest.fixture
+def db():
+    return mongomock_motor.AsyncMongoMockClient()["event_tracker_test"]
+
+@pytest.fixture
+def client(db):
+    app = FastAPI()
+    app.include_router(events.router, prefix="/api")
+    app.dependency_overrides[get_read_db] = lambda: db
+    with TestClient(app) as client:
+        yield client
+
+def _insert(client, db, *documents):
+    client.portal.call(db["events"].insert_many, [dict(document) for document in documents])
+
+@pytest.mark.parametrize("params", [{}, {"limit": 10}])
+def test_events_by_date_skips_expectations_and_outcomes(client, db, params):
+    _insert(client, db, EVENT, EXPECTATION, OUTCOME)
+
+    response = client.get("/api/events", params={"businessDate": BUSINESS_DATE, **params})
+
+    assert response.status_code == 200
+    assert [event["eventId"] for event in response.json()] == [EVENT["eventId"]]
+
+def test_events_by_date_ndjson_skips_expectations_and_outcomes(client, db):
+    _insert(client, db, EVENT, EXPECTATION, OUTCOME)
+
+    response = client.get(
+        "/api/events",
+        params={"businessDate": BUSINESS_DATE},
+        headers={"Accept": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines() if line]
+    assert [row["eventId"] for row in rows] == [EVENT["eventId"]]
@@ -0,0 +1,97 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.services.running_statistics import RunningStatisticsRecorder, reshift, summarize
+
+BUSINESS_DATE = "2024-05-01"
+MIDNIGHT = datetime(2024, 5, 1)
+BUCKET_SECONDS = 300
+
+# Late-evening arrivals a few milliseconds apart: sum_squares / count - mean^2
+# around zero loses every significant digit of the variance here
+OFFSETS = 86000 + np.random.default_rng(7).normal(0, 0.005, 3000)
+
+def _events(offsets):
+    return [
+        {
+            "businessDate": BUSINESS_DATE,
+            "eventName": "LOAD_TRADES",
+            "eventStatus": "SUCCESS",
+            "eventTime": MIDNIGHT + timedelta(seconds=float(offset)),
+        }
+        for offset in offsets
+    ]
+
+def _delta(offsets, shift):
+    offsets = np.asarray(offsets)
+    return {
+        "shift": shift,
+        "count": len(offsets),
+        "sum": float(np.sum(offsets - shift)),
+        "sum_squares": float(np.sum((offsets - shift) ** 2)),
+        "histogram": {},
+    }
+
+def _recorded(offsets):
+    recorder = RunningStatisticsRecorder({"event_statistics": None}, flush_interval_ms=1000, bucket_seconds=BUCKET_SECONDS)
+    recorder.record(_events(offsets))
+    return recorder._pending[("LOAD_TRADES", "SUCCESS")]
+
+def test_reshift_matches_sums_taken_around_the_new_shift():
+    values = OFFSETS[:100]
+    expected = _delta(values, 86000.0)
+
+    delta_sum, delta_sum_squares = reshift(_delta(values, float(values[0])), 86000.0)
+
+    assert delta_sum == pytest.approx(expected["sum"], abs=1e-6)
+    assert delta_sum_squares == pytest.approx(expected["sum_squares"], abs=1e-6)
+
+def test_summarize_matches_numpy_for_clustered_values():
+    running = _recorded(OFFSETS)
+
+    summary = summarize(running, BUCKET_SECONDS)
+
+    assert summary["count"] == len(OFFSETS)
+    assert summary["mean_seconds"] == pytest.approx(np.mean(OFFSETS), abs=1e-6)
+    assert summary["stddev_seconds"] == pytest.approx(np.std(OFFSETS), rel=1e-3)
+
+def test_merging_deltas_with_different_shifts_matches_numpy():
+    # Each recorder shifts by the first value it saw, so every delta has its own shift
+    parts = np.array_split(OFFSETS, 3)
+    deltas = [_recorded(part) for part in parts]
+    assert len({delta["shift"] for delta in deltas}) == 3
+
+    recorder = RunningStatisticsRecorder({"event_statistics": None}, flush_interval_ms=1000, bucket_seconds=BUCKET_SECONDS)
+    for delta in deltas:
+        recorder._merge_back(("LOAD_TRADES", "SUCCESS"), delta)
+    summary = summarize(recorder._pending[("LOAD_TRADES", "SUCCESS")], BUCKET_SECONDS)
+
+    assert summary["count"] == len(OFFSETS)
+    assert summary["mean_seconds"] == pytest.approx(np.mean(OFFSETS), abs=1e-6)
+    assert summary["stddev_seconds"] == pytest.approx(np.std(OFFSETS), rel=1e-3)
+
+def test_running_update_keeps_the_first_writers_shift():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    collection = mongomock_motor.AsyncMongoMockClient()["event_tracker_test"]["event_statistics"]
+    parts = np.array_split(OFFSETS, 3)
+
+    async def apply_all():
+        for part in parts:
+            await collection.update_one(
+                {"event_name": "LOAD_TRADES", "event_status": "SUCCESS"},
+                RunningStatisticsRecorder.running_update(_recorded(part), "2024-05-02T00:00:00"),
+                upsert=True,
+            )
+        return await collection.find_one({"event_name": "LOAD_TRADES"})
+
+    document = asyncio.run(apply_all())
+    summary = summarize(document["running"], BUCKET_SECONDS)
+
+    assert document["running"]["shift"] == _recorded(parts[0])["shift"]
+    assert summary["count"] == len(OFFSETS)
+    assert summary["mean_seconds"] == pytest.approx(np.mean(OFFSETS), abs=1e-6)
+    assert summary["stddev_seconds"] == pytest.approx(np.std(OFFSETS), rel=1e-3)
+    assert sum(document["running"]["histogram"].values()) == len(OFFSETS)
@@ -0,0 +1,35 @@
+from app.services.sla_evaluator import TimerWheel
+
+def test_advance_fires_entries_due_by_now():
+    wheel = TimerWheel(tick_seconds=1, slots=8, now=0)
+    wheel.schedule(3, "a")
+    wheel.schedule(5, "b")
+
+    assert wheel.advance(2) == []
+    assert wheel.advance(4) == ["a"]
+    assert wheel.advance(5) == ["b"]
+
+def test_entries_past_one_revolution_wait_for_their_tick():
+    wheel = TimerWheel(tick_seconds=1, slots=8, now=0)
+    wheel.schedule(3, "soon")
+    wheel.schedule(11, "next revolution")
+
+    assert wheel.advance(3) == ["soon"]
+    assert wheel.advance(10) == []
+    assert wheel.advance(11) == ["next revolution"]
+
+def test_advance_past_more_than_one_revolution_fires_everything_due():
+    wheel = TimerWheel(tick_seconds=1, slots=8, now=0)
+    for when in range(1, 30):
+        wheel.schedule(when, when)
+    wheel.schedule(40, "later")
+
+    assert sorted(wheel.advance(25)) == list(range(1, 26))
+    assert sorted(wheel.advance(39)) == list(range(26, 30))
+    assert wheel.advance(40) == ["later"]
+
+def test_schedule_in_the_past_fires_on_the_next_tick():
+    wheel = TimerWheel(tick_seconds=1, slots=8, now=100)
+    wheel.schedule(50, "overdue")
+
+    assert wheel.advance(101) == ["overdue"]